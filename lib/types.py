@@ -0,0 +1,493 @@
+"""
+Python mirror of lib/types.ts for the Python services
+Records are slotted, keyword-only dataclasses with the TS field names and order;
+batch containers hold large result sets, such as a night's forecasts, as columns
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+ProductCategory = Literal['Food', 'Non-Food']
+CategoryType = Literal['Fresh Food', 'Produce', 'Dry Goods', 'Dairy', 'Meat', 'Beverages', 'Supplies', 'Equipment']
+ExpenseCategory = Literal['Utilities', 'Rent', 'Labor', 'Marketing', 'Other']
+ModelType = Literal['prophet', 'arima', 'regression']
+Comparison = Literal['better', 'similar', 'worse', 'different']
+
+@dataclass(slots=True, kw_only=True)
+class Product:
+    id: str
+    name: str
+    quantity: float
+    initialQuantity: Optional[float] = None
+    unit: str
+    packageSize: float
+    packageUnit: str
+    cost: float
+    category: ProductCategory
+    categoryType: CategoryType
+    supplier: Optional[str] = None
+    unitsPerPackage: Optional[float] = None
+    packsPerCase: Optional[float] = None
+    unitsPerPack: Optional[float] = None
+    priceHistory: Optional[List[Dict[str, Any]]] = None  # {date, price, packageSize?, quantity?}
+    restockHistory: Optional[List[Dict[str, Any]]] = None  # {date, quantity, cost}
+    # AI substitution
+    substitutes: Optional[List[str]] = None
+    nutritionalInfo: Optional[Dict[str, float]] = None
+    allergens: Optional[List[str]] = None
+    flavorProfile: Optional[List[str]] = None
+    # Availability
+    isAvailable: Optional[bool] = None
+    currentStock: Optional[float] = None
+    reorderPoint: Optional[float] = None
+    # Predictive analytics
+    safetyStock: Optional[float] = None
+    leadTime: Optional[int] = None  # days
+    autoRestockEnabled: Optional[bool] = None
+    forecastAccuracy: Optional[float] = None  # percentage
+    lastForecastDate: Optional[str] = None
+
+@dataclass(slots=True, kw_only=True)
+class RecipeIngredient:
+    productId: str
+    quantity: Union[float, str]
+    unit: str
+    yieldPercentage: Optional[Union[float, str]] = None  # Usable after prep (0-100)
+    lossPercentage: Optional[Union[float, str]] = None  # Lost during prep (0-100)
+    preparationNotes: Optional[str] = None
+    isOptional: Optional[bool] = None
+    substitutionGroup: Optional[str] = None
+
+@dataclass(slots=True, kw_only=True)
+class PreparationStep:
+    id: str
+    stepNumber: int
+    description: str
+    duration: Optional[float] = None  # minutes
+    temperature: Optional[float] = None  # degrees
+    equipment: Optional[List[str]] = None
+    ingredients: Optional[List[str]] = None
+    notes: Optional[str] = None
+
+@dataclass(slots=True, kw_only=True)
+class Recipe:
+    id: str
+    name: str
+    ingredients: List[RecipeIngredient] = field(default_factory=list)
+    servings: float
+    servingSize: float
+    servingUnit: str
+    instructions: Optional[str] = None
+    costHistory: Optional[List[Dict[str, Any]]] = None  # {date, cost}
+    salesHistory: Optional[List[Dict[str, Any]]] = None  # {date, quantity}
+    preparationSteps: Optional[List[PreparationStep]] = None
+    totalYieldPercentage: Optional[float] = None
+    totalLossPercentage: Optional[float] = None
+    difficulty: Optional[Literal['easy', 'medium', 'hard']] = None
+    prepTime: Optional[float] = None  # minutes
+    cookTime: Optional[float] = None  # minutes
+    tags: Optional[List[str]] = None
+
+@dataclass(slots=True, kw_only=True)
+class SubstitutionSuggestion:
+    originalProductId: str
+    originalProductName: str
+    suggestedProductId: str
+    suggestedProductName: str
+    reason: Literal['availability', 'cost', 'nutritional', 'allergen', 'flavor', 'quantity']
+    confidence: float  # 0-1
+    costDifference: float  # Positive = more expensive
+    quantityAdjustment: float
+    notes: str
+    impact: Dict[str, Comparison]  # taste, texture, nutrition, cost
+
+@dataclass(slots=True, kw_only=True)
+class IngredientAvailability:
+    productId: str
+    productName: str
+    isAvailable: bool
+    currentStock: float
+    reorderPoint: float
+    daysUntilRestock: Optional[float] = None
+    alternativeSuppliers: Optional[List[Dict[str, Any]]] = None  # {supplierId, supplierName, price, deliveryTime}
+
+@dataclass(slots=True, kw_only=True)
+class InventoryItem:
+    productId: str
+    currentStock: float
+    unit: str
+    reorderPoint: float
+    lastUpdated: str
+    stockHistory: List[Dict[str, Any]] = field(default_factory=list)  # {date, stock, source?}
+
+@dataclass(slots=True, kw_only=True)
+class Expense:
+    id: str
+    name: str
+    amount: float
+    category: ExpenseCategory
+    date: date
+    recurring: bool
+    frequency: Optional[Literal['monthly', 'weekly', 'daily']] = None
+
+@dataclass(slots=True, kw_only=True)
+class SalesRecord:
+    id: str
+    recipeName: str
+    quantity: float
+    date: str
+    salePrice: float
+
+# Name the forecasting service imports
+Sale = SalesRecord
+
+@dataclass(slots=True, kw_only=True)
+class CostAnalysis:
+    totalCost: float
+    costPerServing: float
+    suggestedPrice: float
+    profitMargin: float
+    breakevenPoint: float
+    markupStrategies: Optional[Dict[str, float]] = None  # conservative, standard, premium, luxury
+    suggestedPrices: Optional[Dict[str, float]] = None
+    profitMargins: Optional[Dict[str, float]] = None
+    marketAnalysis: Optional[Dict[str, str]] = None
+
+@dataclass(slots=True, kw_only=True)
+class CostSavingRecommendation:
+    productId: str
+    currentCost: float
+    suggestedOption: Dict[str, Any]  # supplier, packageSize, unitCost, potentialSavings
+
+# Predictive analytics
+
+@dataclass(slots=True, kw_only=True)
+class SalesForecast:
+    id: str
+    recipeId: str
+    recipeName: str
+    date: str
+    predictedQuantity: float
+    confidenceInterval: Dict[str, float]  # lower, upper
+    modelType: ModelType
+    accuracy: float
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class InventoryForecast:
+    id: str
+    productId: str
+    productName: str
+    date: str
+    predictedStock: float
+    depletionDate: Optional[str] = None
+    reorderDate: Optional[str] = None
+    suggestedOrderQuantity: float
+    confidenceLevel: float
+    modelType: ModelType
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class PurchaseOrderItem:
+    id: str
+    productId: str
+    productName: str
+    quantity: float
+    unitCost: float
+    totalCost: float
+    receivedQuantity: Optional[float] = None
+    receivedAt: Optional[str] = None
+
+@dataclass(slots=True, kw_only=True)
+class PurchaseOrder:
+    id: str
+    supplierId: str
+    supplierName: str
+    status: Literal['pending', 'approved', 'ordered', 'received', 'cancelled']
+    items: List[PurchaseOrderItem] = field(default_factory=list)
+    totalAmount: float
+    createdAt: str
+    expectedDelivery: str
+    actualDeliveryDate: Optional[str] = None
+    notes: Optional[str] = None
+    approvedBy: Optional[str] = None
+    approvedAt: Optional[str] = None
+    updatedAt: str
+    # Stored by the restocking service; not part of the TS interface
+    orderDate: Optional[str] = None
+    autoGenerated: bool = False
+    triggerReason: Optional[str] = None
+
+@dataclass(slots=True, kw_only=True)
+class RestockingDecision:
+    id: str
+    productId: str
+    productName: str
+    currentStock: float
+    reorderPoint: float
+    safetyStock: float
+    averageDailyUsage: float
+    daysUntilDepletion: float
+    suggestedOrderQuantity: float
+    urgency: Literal['low', 'medium', 'high']
+    reason: str
+    status: Literal['pending', 'approved', 'rejected']
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class Anomaly:
+    id: str
+    type: Literal['waste', 'theft', 'over_portioning', 'sales_anomaly', 'inventory_mismatch']
+    severity: Literal['low', 'medium', 'high', 'critical']
+    status: Literal['active', 'acknowledged', 'resolved', 'false_positive']
+    title: str
+    description: str
+    impact: Literal['cost', 'efficiency', 'quality', 'safety']
+    affectedItems: List[str] = field(default_factory=list)
+    metrics: Dict[str, float] = field(default_factory=dict)  # expected, actual, deviation, zScore
+    costImpact: Optional[float] = None
+    suggestedActions: List[str] = field(default_factory=list)
+    detectedAt: str
+    acknowledgedAt: Optional[str] = None
+    resolvedAt: Optional[str] = None
+    acknowledgedBy: Optional[str] = None
+    resolvedBy: Optional[str] = None
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class WasteLog:
+    id: str
+    productId: str
+    productName: str
+    quantity: float
+    reason: Literal['spoilage', 'over_portioning', 'expired', 'damaged', 'other']
+    cost: float
+    date: str
+    reportedBy: str
+    notes: Optional[str] = None
+    createdAt: str
+
+@dataclass(slots=True, kw_only=True)
+class Supplier:
+    id: str
+    name: str
+    contactPerson: str
+    email: str
+    phone: str
+    address: str
+    apiEndpoint: Optional[str] = None
+    apiKey: Optional[str] = None
+    leadTime: int  # days
+    minimumOrder: float
+    paymentTerms: str
+    isActive: bool
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class ForecastingModel:
+    id: str
+    name: str
+    type: Literal['sales', 'inventory', 'waste']
+    algorithm: Literal['prophet', 'arima', 'regression', 'lstm']
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    accuracy: float
+    lastTrained: str
+    isActive: bool
+    createdAt: str
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class Alert:
+    id: str
+    type: Literal['email', 'sms', 'push', 'webhook']
+    recipient: str
+    title: str
+    message: str
+    anomalyId: Optional[str] = None
+    status: Literal['pending', 'sent', 'failed']
+    sentAt: Optional[str] = None
+    errorMessage: Optional[str] = None
+    createdAt: str
+
+@dataclass(slots=True, kw_only=True)
+class AnalyticsSummary:
+    period: Literal['daily', 'weekly', 'monthly']
+    startDate: str
+    endDate: str
+    totalSales: float
+    totalRevenue: float
+    totalCosts: float
+    profit: float
+    profitMargin: float
+    anomaliesDetected: int
+    restockingDecisions: int
+    autoOrdersGenerated: int
+    forecastAccuracy: float
+    topPerformingItems: List[Dict[str, Any]] = field(default_factory=list)  # {recipeId, recipeName, sales, revenue, profit}
+    lowStockItems: List[Dict[str, Any]] = field(default_factory=list)  # {productId, productName, currentStock, reorderPoint, daysUntilDepletion}
+    wasteSummary: Dict[str, Any] = field(default_factory=dict)  # {totalWaste, totalCost, topWasteItems}
+    createdAt: str
+
+# Configuration
+
+@dataclass(slots=True, kw_only=True)
+class RestockingConfig:
+    productId: str
+    autoRestockEnabled: bool
+    safetyStockLevel: float
+    reorderPoint: float
+    leadTime: int
+    minimumOrderQuantity: float
+    maximumOrderQuantity: Optional[float] = None
+    supplierId: str
+    costThreshold: Optional[float] = None  # Maximum cost for auto-orders
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class AnomalyConfig:
+    type: str
+    enabled: bool
+    # zScoreThreshold, percentageThreshold, minimumDeviation, isolationScoreThreshold (operational_outlier)
+    thresholds: Dict[str, float] = field(default_factory=dict)
+    alertChannels: List[Literal['email', 'sms', 'push']] = field(default_factory=list)
+    recipients: List[str] = field(default_factory=list)
+    updatedAt: str
+
+@dataclass(slots=True, kw_only=True)
+class ForecastingConfig:
+    modelType: ModelType
+    forecastHorizon: int  # days
+    confidenceLevel: float
+    updateFrequency: Literal['daily', 'weekly', 'monthly']
+    retrainFrequency: Literal['weekly', 'monthly', 'quarterly']
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    updatedAt: str
+
+# Columnar batches
+
+class RecordBatch(ABC):
+    """Many records of one type held as NumPy columns instead of objects
+
+    Records are appended in chunks and concatenated on first read, so building
+    a batch series by series stays linear. Dates are stored as datetime64[D]
+    and turned back into ISO strings when records or rows are produced.
+    Subclasses list their columns and how a record maps onto them.
+    """
+
+    __slots__ = ('_chunks', '_columns')
+
+    # (column, kind) where kind is 'str', 'float' or 'date'
+    COLUMNS: Tuple[Tuple[str, str], ...] = ()
+    DTYPES = {'str': object, 'float': np.float64, 'date': 'datetime64[D]'}
+
+    def __init__(self):
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name, _ in self.COLUMNS}
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    @classmethod
+    def from_records(cls, records: Sequence[Any]) -> 'RecordBatch':
+        batch = cls()
+        batch.extend(records)
+        return batch
+
+    def extend(self, records: Sequence[Any]):
+        if records:
+            rows = [self.flatten(record) for record in records]
+            self.append_columns(**{name: list(values) for (name, _), values in zip(self.COLUMNS, zip(*rows))})
+
+    def append_columns(self, **columns: Sequence[Any]):
+        """Append one chunk given as equal-length arrays, one per column"""
+        for name, kind in self.COLUMNS:
+            self._chunks[name].append(np.asarray(columns[name], dtype=self.DTYPES[kind]))
+        self._columns = None
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            self._columns = {
+                name: np.concatenate(chunks) if chunks else np.empty(0, dtype=self.DTYPES[kind])
+                for (name, kind), chunks in zip(self.COLUMNS, self._chunks.values())
+            }
+            self._chunks = {name: [array] for name, array in self._columns.items()}
+        return self._columns
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks[self.COLUMNS[0][0]]) if self.COLUMNS else 0
+
+    def column_values(self, name: str) -> List[Any]:
+        """Python values of one column; dates become ISO strings and NaT becomes None"""
+        values = self.columns[name]
+        if values.dtype.kind == 'M':
+            return [None if np.isnat(value) else str(value) for value in values]
+        return values.tolist()
+
+    def rows(self, names: Optional[Sequence[str]] = None) -> List[tuple]:
+        """Row tuples of plain Python values, ready for a bulk insert"""
+        names = names or [name for name, _ in self.COLUMNS]
+        return list(zip(*(self.column_values(name) for name in names)))
+
+    def __iter__(self) -> Iterator[Any]:
+        names = [name for name, _ in self.COLUMNS]
+        for row in self.rows(names):
+            yield self.build(dict(zip(names, row)))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+    @abstractmethod
+    def flatten(self, record: Any) -> tuple:
+        """One record as a tuple in COLUMNS order"""
+
+    @abstractmethod
+    def build(self, row: Dict[str, Any]) -> Any:
+        """The record for one row given as {column: value}"""
+
+class SalesForecastBatch(RecordBatch):
+    __slots__ = ()
+
+    COLUMNS = (
+        ('id', 'str'), ('recipeId', 'str'), ('recipeName', 'str'), ('date', 'date'),
+        ('predictedQuantity', 'float'), ('confidenceLower', 'float'), ('confidenceUpper', 'float'),
+        ('modelType', 'str'), ('accuracy', 'float'), ('createdAt', 'str'), ('updatedAt', 'str')
+    )
+
+    def flatten(self, record: SalesForecast) -> tuple:
+        return (
+            record.id, record.recipeId, record.recipeName, record.date, record.predictedQuantity,
+            record.confidenceInterval['lower'], record.confidenceInterval['upper'],
+            record.modelType, record.accuracy, record.createdAt, record.updatedAt
+        )
+
+    def build(self, row: Dict[str, Any]) -> SalesForecast:
+        lower, upper = row.pop('confidenceLower'), row.pop('confidenceUpper')
+        return SalesForecast(confidenceInterval={'lower': lower, 'upper': upper}, **row)
+
+class InventoryForecastBatch(RecordBatch):
+    __slots__ = ()
+
+    COLUMNS = (
+        ('id', 'str'), ('productId', 'str'), ('productName', 'str'), ('date', 'date'),
+        ('predictedStock', 'float'), ('depletionDate', 'date'), ('reorderDate', 'date'),
+        ('suggestedOrderQuantity', 'float'), ('confidenceLevel', 'float'), ('modelType', 'str'),
+        ('createdAt', 'str'), ('updatedAt', 'str')
+    )
+
+    def flatten(self, record: InventoryForecast) -> tuple:
+        return (
+            record.id, record.productId, record.productName, record.date, record.predictedStock,
+            record.depletionDate, record.reorderDate, record.suggestedOrderQuantity,
+            record.confidenceLevel, record.modelType, record.createdAt, record.updatedAt
+        )
+
+    def build(self, row: Dict[str, Any]) -> InventoryForecast:
+        return InventoryForecast(**row)
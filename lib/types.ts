@@ -410,6 +410,7 @@ export interface AnomalyConfig {
     zScoreThreshold: number;
     percentageThreshold: number;
     minimumDeviation: number;
+    isolationScoreThreshold?: number; // operational_outlier only
   };
   alertChannels: ('email' | 'sms' | 'push')[];
   recipients: string[];
@@ -0,0 +1,106 @@
+"""
+Alert Dispatcher for Restaurant Management
+Deduplicates alerts, batches Redis writes and fans out to channels concurrently under rate limits
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sends per second allowed for each channel; in-app alerts are a single Redis pipeline
+DEFAULT_RATE_LIMITS = {
+    'email': 5.0,
+    'sms': 1.0
+}
+
+class RateLimiter:
+    """Token bucket shared by all concurrent sends on one channel"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated: Optional[float] = None
+        self.lock: Optional[asyncio.Lock] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Each job run may use its own event loop; locks cannot cross loops
+            self.loop, self.lock, self.updated = loop, asyncio.Lock(), None
+
+        async with self.lock:
+            now = loop.time()
+            if self.updated is not None:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.updated = loop.time()
+
+            self.tokens -= 1
+
+class AlertDispatcher:
+    def __init__(self, redis_client, rate_limits: Optional[Dict[str, float]] = None,
+                 dedup_ttl: int = 7 * 86400, alerts_key: str = 'alerts', alerts_ttl: int = 86400,
+                 fingerprint_prefix: str = 'alert:fingerprint'):
+        self.redis_client = redis_client
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.dedup_ttl = dedup_ttl
+        self.alerts_key = alerts_key
+        self.alerts_ttl = alerts_ttl
+        self.fingerprint_prefix = fingerprint_prefix
+
+    def claim_new(self, fingerprints: List[str]) -> List[bool]:
+        """Atomically mark fingerprints as alerted; True for those not seen within the TTL"""
+        if not fingerprints:
+            return []
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for fingerprint in fingerprints:
+            pipeline.set(f"{self.fingerprint_prefix}:{fingerprint}", 1, nx=True, ex=self.dedup_ttl)
+
+        return [bool(claimed) for claimed in pipeline.execute()]
+
+    def release(self, fingerprints: List[str]):
+        """Drop claims for alerts that were not delivered, so a later run can send them"""
+        if fingerprints:
+            self.redis_client.delete(*(f"{self.fingerprint_prefix}:{fingerprint}" for fingerprint in fingerprints))
+
+    def push_in_app(self, payloads: List[Dict[str, Any]]):
+        """Push all in-app alerts with one pipelined round trip"""
+        if not payloads:
+            return
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.lpush(self.alerts_key, *(json.dumps(payload) for payload in payloads))
+        pipeline.expire(self.alerts_key, self.alerts_ttl)
+        pipeline.execute()
+
+    def limiter(self, channel: str) -> RateLimiter:
+        if channel not in self.limiters:
+            self.limiters[channel] = RateLimiter(self.rate_limits.get(channel, 10.0))
+        return self.limiters[channel]
+
+    async def send_all(self, channel: str, send: Callable[[Any], Awaitable[bool]], items: List[Any]) -> List[bool]:
+        """Send every item on a channel concurrently, paced by its rate limit; returns per-item success"""
+        limiter = self.limiter(channel)
+
+        async def limited(item):
+            await limiter.acquire()
+            return await send(item)
+
+        results = await asyncio.gather(*(limited(item) for item in items), return_exceptions=True)
+
+        delivered = [not isinstance(result, Exception) and bool(result) for result in results]
+        if not all(delivered):
+            logger.warning(f"{delivered.count(False)} of {len(items)} {channel} alerts failed")
+
+        return delivered
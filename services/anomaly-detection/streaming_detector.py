@@ -0,0 +1,163 @@
+"""
+Streaming Anomaly Detector for Restaurant Management
+Keeps per-series running daily statistics in Redis hashes and scores each event in O(1)
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Accumulates an event into the current day's total. When a later day arrives the
+# completed day (and any empty days in between) is folded into the running
+# Welford mean/M2 first. Capping the count turns the running mean into an
+# exponentially weighted one, so old behaviour is gradually forgotten.
+# The intraday spike check runs here too: the first event of a day whose running
+# total crosses the z threshold sets alerted_day in the same atomic step, so only
+# one replica raises the spike.
+# Returns {status, day_total, count, mean, m2, closed_day, closed_total,
+# closed_count, closed_mean, closed_m2, spike}; spike is '1' when this event
+# raises the day's spike. Numbers are strings because Lua numbers would be
+# truncated to integers in the reply.
+UPDATE_SERIES_SCRIPT = """
+local day = tonumber(ARGV[1])
+local amount = tonumber(ARGV[2])
+local max_count = tonumber(ARGV[3])
+local z_threshold = tonumber(ARGV[4])
+local min_observations = tonumber(ARGV[5])
+
+local h = redis.call('HMGET', KEYS[1], 'day', 'day_total', 'count', 'mean', 'm2', 'alerted_day')
+local current_day = tonumber(h[1])
+local total = tonumber(h[2]) or 0
+local n = tonumber(h[3]) or 0
+local mean = tonumber(h[4]) or 0
+local m2 = tonumber(h[5]) or 0
+local alerted_day = h[6] or ''
+
+if current_day and day < current_day then
+    return {'late'}
+end
+
+local closed = {'', '', '', '', ''}
+
+if current_day and day > current_day then
+    closed = {tostring(current_day), tostring(total), tostring(n), tostring(mean), tostring(m2)}
+
+    -- Fold the completed day
+    local weight = math.min(n + 1, max_count)
+    local delta = total - mean
+    mean = mean + delta / weight
+    m2 = m2 * (weight - 1) / math.max(n, 1) + delta * (total - mean)
+    n = weight
+
+    -- Fold the days without events as a batch of zeros (Chan et al. merge)
+    local gap = day - current_day - 1
+    if gap > 0 and n > 0 then
+        local merged = math.min(n + gap, max_count)
+        local k = merged - n
+        if k > 0 then
+            local d = 0 - mean
+            mean = mean + d * k / merged
+            m2 = m2 + d * d * n * k / merged
+            n = merged
+        end
+    end
+
+    total = 0
+end
+
+total = total + amount
+redis.call('HSET', KEYS[1], 'day', day, 'day_total', total, 'count', n, 'mean', mean, 'm2', m2)
+
+-- Running totals only grow during the day, so spikes are raised once per day
+local spike = ''
+if n >= min_observations and n > 1 and alerted_day ~= tostring(day) then
+    local std = math.sqrt(m2 / (n - 1))
+    if std > 0 and (total - mean) / std > z_threshold then
+        redis.call('HSET', KEYS[1], 'alerted_day', day)
+        spike = '1'
+    end
+end
+
+return {'ok', tostring(total), tostring(n), tostring(mean), tostring(m2),
+        closed[1], closed[2], closed[3], closed[4], closed[5], spike}
+"""
+
+@dataclass
+class StreamingScore:
+    series_type: str
+    item_id: str
+    day: str
+    value: float
+    expected: float
+    std: float
+    z_score: float
+    kind: str  # 'spike' scored intraday, 'drop' scored when the day closes
+
+class StreamingAnomalyDetector:
+    """Scores sales, waste and consumption events against running per-series statistics"""
+
+    def __init__(self, redis_client, z_threshold: float = 2.0, min_observations: int = 7,
+                 max_count: int = 30, key_prefix: str = "anomaly:series"):
+        self.redis_client = redis_client
+        self.z_threshold = z_threshold
+        self.min_observations = min_observations
+        self.max_count = max_count
+        self.key_prefix = key_prefix
+        self.update_series = redis_client.register_script(UPDATE_SERIES_SCRIPT)
+
+    def series_key(self, series_type: str, item_id: str) -> str:
+        return f"{self.key_prefix}:{series_type}:{item_id}"
+
+    def _score(self, value: float, count: float, mean: float, m2: float) -> Optional[tuple]:
+        if count < self.min_observations:
+            return None
+
+        std = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+        if std <= 0:
+            return None
+
+        return std, (value - mean) / std
+
+    def process_event(self, series_type: str, item_id: str, amount: float,
+                      timestamp: Optional[datetime] = None) -> List[StreamingScore]:
+        """Accumulate one event and return any scores that cross the threshold"""
+        timestamp = timestamp or datetime.now()
+        day = timestamp.date().toordinal()
+        key = self.series_key(series_type, item_id)
+
+        reply = self.update_series(
+            keys=[key], args=[day, amount, self.max_count, self.z_threshold, self.min_observations]
+        )
+        reply = [value.decode() if isinstance(value, bytes) else value for value in reply]
+
+        if reply[0] != 'ok':
+            logger.debug(f"Ignoring late event for {key}")
+            return []
+
+        total, count, mean, m2 = (float(value) for value in reply[1:5])
+        closed_day, spike = reply[5], reply[10]
+        scores = []
+
+        # A completed day can only be judged as a drop once it is over
+        if closed_day:
+            closed_total, closed_count, closed_mean, closed_m2 = (float(value) for value in reply[6:10])
+            result = self._score(closed_total, closed_count, closed_mean, closed_m2)
+            if result and result[1] < -self.z_threshold:
+                scores.append(StreamingScore(
+                    series_type, item_id, date.fromordinal(int(closed_day)).isoformat(),
+                    closed_total, closed_mean, result[0], result[1], 'drop'
+                ))
+
+        # The script decided the spike and marked the day alerted atomically
+        result = self._score(total, count, mean, m2) if spike else None
+        if result:
+            scores.append(StreamingScore(
+                series_type, item_id, timestamp.date().isoformat(),
+                total, mean, result[0], result[1], 'spike'
+            ))
+
+        return scores
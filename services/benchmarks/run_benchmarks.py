@@ -0,0 +1,350 @@
+"""
+Scale Benchmarks for Restaurant Management
+Runs each service end to end on synthetic data and records throughput, per-stage timings,
+peak memory and query counts in a machine-readable baseline
+
+    python services/benchmarks/run_benchmarks.py --scales 100 1000 --output baseline.json
+    python services/benchmarks/run_benchmarks.py --scales 100 1000 --compare baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import importlib
+import logging
+import platform
+import resource
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the path
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(SERVICES_DIR))
+
+from services.shared.storage import StorageBackend, storage_from_url
+from synthetic_data import SCALES, SyntheticConfig, SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ServiceBenchmark:
+    directory: str
+    module: str
+    class_name: str
+    entry_point: str
+    stages: List[str]  # Methods timed per call; dotted paths reach helper objects
+    series: str = 'all'  # 'all' (recipes + products) or 'products'
+    options: Dict[str, Any] = field(default_factory=dict)
+
+SERVICES = {
+    'forecasting': ServiceBenchmark(
+        'forecasting', 'forecasting_service', 'ForecastingService', 'run_daily_forecasting', [
+            'get_all_recipes', 'get_all_products', 'get_sales_data', 'get_inventory_data',
+            'get_product_config', 'get_model', 'train_prophet_model', 'forecast_with_prophet',
+            'calculate_forecast_accuracy', 'save_forecasts'
+        ],
+        options={'model_dir': 'forecast_models'}
+    ),
+    'restocking': ServiceBenchmark(
+        'restocking', 'restocking_service', 'AutoRestockingService', 'run_auto_restocking', [
+            'get_inventory_forecasts', 'get_product_configs', 'get_current_inventory',
+            'safety_stock_simulator.simulate_from_forecasts', 'calculate_restocking_decisions',
+            'save_restocking_decisions', 'get_supplier_offers', 'order_optimizer.optimize',
+            'generate_purchase_orders', 'save_purchase_orders'
+        ],
+        series='products'
+    ),
+    'anomaly': ServiceBenchmark(
+        'anomaly-detection', 'anomaly_service', 'AnomalyDetectionService', 'run_anomaly_detection', [
+            'refresh_rollups', 'get_sales_data', 'get_inventory_data', 'get_waste_analytics',
+            'get_detection_thresholds', 'get_recipe_ingredients', 'detect_sales_anomalies',
+            'detect_waste_anomalies', 'detect_theft_indicators', 'detect_over_portioning',
+            'detect_multivariate_anomalies', 'save_anomalies', 'send_alerts'
+        ],
+        options={'model_dir': 'models'}
+    )
+}
+
+# Stage a query is attributed to; the innermost timed method wins
+CURRENT_STAGE: ContextVar[str] = ContextVar('benchmark_stage', default='other')
+
+class CountingCursor:
+    def __init__(self, cursor, storage: 'CountingStorage'):
+        self._cursor = cursor
+        self._storage = storage
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, *args, **kwargs):
+        self._storage.count()
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._storage.count()
+        return self._cursor.executemany(*args, **kwargs)
+
+class CountingConnection:
+    def __init__(self, conn, storage: 'CountingStorage'):
+        self._conn = conn
+        self._storage = storage
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs), self._storage)
+
+class CountingStorage(StorageBackend):
+    """Delegating backend that counts statements per benchmark stage"""
+
+    def __init__(self, inner: StorageBackend):
+        self.inner = inner
+        self.dialect = inner.dialect
+        self.supports_notify = inner.supports_notify
+        self.queries: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.queries[CURRENT_STAGE.get()] += 1
+
+    def connect(self):
+        return CountingConnection(self.inner.connect(), self)
+
+    def init_pool(self, minconn: int = 1, maxconn: int = 8):
+        self.inner.init_pool(minconn, maxconn)
+
+    def stream_cursor(self, conn, name: str):
+        return CountingCursor(self.inner.stream_cursor(conn._conn, name), self)
+
+    def bulk_insert(self, cursor, query: str, rows, page_size: int = 500):
+        self.count()
+        self.inner.bulk_insert(cursor._cursor, query, rows, page_size=page_size)
+
+def instrument(service, stages: List[str], stats: Dict[str, Dict[str, float]]):
+    """Wrap each stage method to record calls and inclusive wall time"""
+    lock = threading.Lock()
+
+    def record(stage, started):
+        with lock:
+            stats[stage]['calls'] += 1
+            stats[stage]['seconds'] += time.perf_counter() - started
+
+    for stage in stages:
+        owner_path, _, attribute = stage.rpartition('.')
+        owner = service
+        for part in filter(None, owner_path.split('.')):
+            owner = getattr(owner, part)
+        original = getattr(owner, attribute)
+
+        if asyncio.iscoroutinefunction(original):
+            async def wrapper(*args, _stage=stage, _original=original, **kwargs):
+                token, started = CURRENT_STAGE.set(_stage), time.perf_counter()
+                try:
+                    return await _original(*args, **kwargs)
+                finally:
+                    record(_stage, started)
+                    CURRENT_STAGE.reset(token)
+        else:
+            def wrapper(*args, _stage=stage, _original=original, **kwargs):
+                token, started = CURRENT_STAGE.set(_stage), time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    record(_stage, started)
+                    CURRENT_STAGE.reset(token)
+
+        setattr(owner, attribute, wrapper)
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+async def _no_supplier_latency(purchase_order) -> bool:
+    return True
+
+def run_service(name: str, database_url: str, redis_url: str, n_series: int,
+                workdir: str, log_level: str) -> Dict[str, Any]:
+    """Benchmark one service in the current (fresh) process"""
+    spec = SERVICES[name]
+    sys.path.insert(0, os.path.join(SERVICES_DIR, spec.directory))
+    result: Dict[str, Any] = {'service': name, 'series': n_series}
+
+    try:
+        module = importlib.import_module(spec.module)
+    except ImportError as e:
+        return {**result, 'status': 'skipped', 'error': f"missing dependency: {e}"}
+
+    logging.getLogger().setLevel(log_level)
+
+    storage = CountingStorage(storage_from_url(database_url))
+    # Per scale, so stored models from another dataset are never reused
+    options = {key: os.path.join(workdir, f"{value}_{n_series}") for key, value in spec.options.items()}
+    service = getattr(module, spec.class_name)(database_url, redis_url, storage=storage, **options)
+
+    # Leases of its own, so an earlier run that completed the job window never skips this one
+    if hasattr(service, 'job_key_prefix'):
+        service.job_key_prefix = f"benchmark:{uuid.uuid4().hex}"
+
+    # Supplier dispatch is a simulated one-second sleep per order, not service work
+    if hasattr(service, 'send_to_supplier_api'):
+        service.send_to_supplier_api = _no_supplier_latency
+
+    stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+    instrument(service, spec.stages, stats)
+    import_rss = peak_rss_mb()
+
+    started = time.perf_counter()
+    try:
+        report = asyncio.run(getattr(service, spec.entry_point)())
+        status, error = 'ok', None
+        if isinstance(report, dict) and 'skipped' in report:
+            # Leases fail closed, so without Redis the job does not run at all
+            status, error = 'skipped', report['skipped']
+    except Exception as e:
+        report, status, error = None, 'error', str(e)
+    seconds = time.perf_counter() - started
+
+    stages = {
+        stage: {**values, 'queries': storage.queries.get(stage, 0)}
+        for stage, values in stats.items()
+    }
+    if storage.queries.get('other'):
+        stages['other'] = {'calls': 0, 'seconds': 0.0, 'queries': storage.queries['other']}
+
+    result.update({
+        'status': status,
+        'error': error,
+        'seconds': seconds,
+        'series_per_second': n_series / seconds if seconds > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'import_rss_mb': import_rss,
+        'queries': sum(storage.queries.values()),
+        'stages': stages
+    })
+    if isinstance(report, dict):
+        result['report'] = report
+
+    return result
+
+def run_scale(n_series: int, services: List[str], redis_url: str, workdir: str,
+              log_level: str, database_url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Generate one dataset and benchmark every service against it, each in its own process"""
+    config = SyntheticConfig.for_series(n_series)
+    database_url = database_url or f"sqlite:///{os.path.join(workdir, f'synthetic_{n_series}.sqlite')}"
+
+    started = time.perf_counter()
+    rows = SyntheticDataGenerator(storage_from_url(database_url), config).generate()
+    results = [{
+        'scale': n_series, 'service': 'generate', 'status': 'ok',
+        'seconds': time.perf_counter() - started, 'rows': rows
+    }]
+
+    for name in services:
+        n = config.n_products if SERVICES[name].series == 'products' else config.n_recipes + config.n_products
+        # A fresh process per service keeps peak memory and imports separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            result = pool.submit(run_service, name, database_url, redis_url, n, workdir, log_level).result()
+        result['scale'] = n_series
+        results.append(result)
+        logger.info(f"{name} @ {n_series}: {result['status']} in {result.get('seconds', 0):.2f}s")
+
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions against a baseline: time or memory beyond tolerance, or any extra queries"""
+    previous = {(r['scale'], r['service']): r for r in baseline.get('results', []) if r.get('status') == 'ok'}
+    regressions = []
+
+    for result in results:
+        base = previous.get((result['scale'], result['service']))
+        if base is None or result.get('status') != 'ok':
+            continue
+
+        label = f"{result['service']} @ {result['scale']}"
+        if result['seconds'] > base['seconds'] * (1 + tolerance):
+            regressions.append(f"{label}: {result['seconds']:.2f}s vs {base['seconds']:.2f}s")
+        if 'peak_rss_mb' in base and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{label}: peak {result['peak_rss_mb']:.0f}MB vs {base['peak_rss_mb']:.0f}MB")
+        if 'queries' in base and result['queries'] > base['queries']:
+            regressions.append(f"{label}: {result['queries']} queries vs {base['queries']}")
+
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES[:2],
+                        help=f"catalogue sizes to generate (recipes + products), e.g. {SCALES}")
+    parser.add_argument('--services', nargs='+', choices=list(SERVICES), default=list(SERVICES))
+    parser.add_argument('--redis-url', default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument('--database-url', help="benchmark an existing empty database instead of SQLite files")
+    parser.add_argument('--workdir', help="where datasets and models are written (default: a temporary directory)")
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', help="baseline JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative slowdown or memory growth")
+    parser.add_argument('--log-level', default='WARNING', help="log level inside the services")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='restaurant_bench_')
+    os.makedirs(workdir, exist_ok=True)
+
+    try:
+        results = []
+        for n_series in args.scales:
+            results.extend(run_scale(n_series, args.services, args.redis_url, workdir,
+                                     args.log_level, args.database_url))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    document = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2, default=str)
+        logger.info(f"Wrote benchmark results to {args.output}")
+    else:
+        print(json.dumps(document, indent=2, default=str))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
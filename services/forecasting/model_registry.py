@@ -0,0 +1,128 @@
+"""
+Model Registry for Restaurant Management
+Stores fitted forecasting models between runs with the metadata needed to decide when to refit
+"""
+
+import os
+import re
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from prophet.serialize import model_from_json, model_to_json
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RetrainPolicy:
+    max_error: float = 0.35  # WAPE on recent actuals above which the model is refit
+    drift_ratio: float = 1.5  # Noisy series: refit only above this multiple of the model's fit error
+    max_age_days: int = 14  # Refit at least this often regardless of error
+    error_window_days: int = 7  # Most recent out-of-sample days the error is tracked over
+    min_error_days: int = 3  # Out-of-sample days needed before the error is trusted
+
+    def error_threshold(self, fit_error: float) -> float:
+        return max(self.max_error, self.drift_ratio * fit_error)
+
+# Per series class; sparse sales are noisy, stock levels drift with every delivery
+DEFAULT_RETRAIN_POLICIES = {
+    'sales': RetrainPolicy(max_error=0.35, max_age_days=14),
+    'sales_sparse': RetrainPolicy(max_error=0.6, max_age_days=28),
+    'inventory': RetrainPolicy(max_error=0.25, max_age_days=7)
+}
+
+# Mean daily sales over the last four weeks below which a recipe counts as sparse
+SPARSE_DAILY_SALES = 1.0
+
+@dataclass
+class StoredModel:
+    model: Any
+    series_class: str
+    fitted_at: datetime
+    trained_through: pd.Timestamp  # Last day of history the model was fitted on
+    fit_error: float = 0.0  # In-sample WAPE over the last error window of the history
+    bias: float = 0.0  # Mean residual on out-of-sample actuals, added to predictions
+    error: Optional[float] = None  # Latest WAPE on out-of-sample actuals
+
+def weighted_error(actual: np.ndarray, predicted: np.ndarray) -> float:
+    """WAPE: total absolute error over total absolute actuals"""
+    total = np.abs(actual).sum()
+    error = np.abs(actual - predicted).sum()
+    if total > 0:
+        return float(error / total)
+    return 0.0 if error == 0 else float('inf')
+
+class ModelRegistry:
+    """Fitted models kept in memory and on disk, one model file and one metadata file per series
+
+    The model file is only rewritten on a refit; the small metadata file is
+    rewritten whenever the tracked error or bias changes.
+    """
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self.models: Dict[str, StoredModel] = {}
+
+    def _path(self, model_name: str, suffix: str) -> str:
+        safe_name = re.sub(r'[^\w.-]', '_', model_name)
+        return os.path.join(self.model_dir, f"{safe_name}.{suffix}.json")
+
+    def get(self, model_name: str) -> Optional[StoredModel]:
+        """The stored model, loading it from disk on first use; None if there is none"""
+        if model_name in self.models:
+            return self.models[model_name]
+
+        model_path, meta_path = self._path(model_name, 'model'), self._path(model_name, 'meta')
+        if not (os.path.exists(model_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(model_path) as f:
+                model = model_from_json(f.read())
+        except Exception as e:
+            logger.warning(f"Could not load stored model {model_name}, it will be refit: {e}")
+            return None
+
+        stored = StoredModel(
+            model=model,
+            series_class=meta['series_class'],
+            fitted_at=datetime.fromisoformat(meta['fitted_at']),
+            trained_through=pd.Timestamp(meta['trained_through']),
+            fit_error=meta['fit_error'],
+            bias=meta['bias'],
+            error=meta['error']
+        )
+        self.models[model_name] = stored
+        return stored
+
+    def put(self, model_name: str, stored: StoredModel, refit: bool):
+        """Store the model; the model file is written only when it was refit"""
+        self.models[model_name] = stored
+
+        os.makedirs(self.model_dir, exist_ok=True)
+        meta = {
+            'series_class': stored.series_class,
+            'fitted_at': stored.fitted_at.isoformat(),
+            'trained_through': stored.trained_through.isoformat(),
+            'fit_error': stored.fit_error,
+            'bias': stored.bias,
+            'error': stored.error
+        }
+        writes = [(self._path(model_name, 'meta'), json.dumps(meta))]
+        if refit:
+            writes.insert(0, (self._path(model_name, 'model'), model_to_json(stored.model)))
+
+        try:
+            for path, content in writes:
+                # Write-then-rename so a crash never leaves a truncated file
+                with open(f"{path}.tmp", 'w') as f:
+                    f.write(content)
+                os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            logger.warning(f"Could not persist model {model_name}: {e}")
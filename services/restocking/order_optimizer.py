@@ -0,0 +1,163 @@
+"""
+Multi-Supplier Order Consolidation Optimizer for Restaurant Management
+Chooses a supplier and quantity for every restocking decision at once, minimising total cost
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PLAN_COLUMNS = [
+    'product_id', 'product_name', 'supplier_id', 'supplier_name', 'order_quantity',
+    'unit_price', 'line_cost', 'lead_time', 'late', 'padded_to_minimum'
+]
+
+@dataclass
+class OptimizerConfig:
+    max_iterations: int = 10
+    allow_late_suppliers: bool = True  # Fall back to the fastest supplier when none meets the lead time
+
+class OrderOptimizer:
+    """Vectorized greedy assignment followed by a supplier-consolidation local search
+
+    demand rows: product_id, product_name, quantity, max_lead_time
+    offer rows:  product_id, supplier_id, supplier_name, lead_time, minimum_order,
+                 min_quantity, unit_price (one row per price break)
+
+    minimum_order is the supplier's minimum order value in currency, across
+    all lines of one purchase order, and is compared against line_cost;
+    min_quantity is the per-line unit quantity a price break starts at.
+    Demand rows with no positive quantity are ignored.
+    """
+
+    def __init__(self, config: Optional[OptimizerConfig] = None):
+        self.config = config or OptimizerConfig()
+
+    def price_options(self, demand: pd.DataFrame, offers: pd.DataFrame) -> pd.DataFrame:
+        """Cheapest feasible line for every (product, supplier) pair"""
+        candidates = demand.merge(offers, on='product_id', how='inner')
+
+        if candidates.empty:
+            return candidates
+
+        # Each price break is a candidate: order at least its minimum quantity at its
+        # price. Taking the cheapest candidate per pair handles bumping up to a break.
+        candidates['order_quantity'] = np.maximum(candidates['quantity'], candidates['min_quantity'])
+        candidates['line_cost'] = candidates['order_quantity'] * candidates['unit_price']
+        cheapest = candidates.groupby(['product_id', 'supplier_id'])['line_cost'].idxmin()
+        options = candidates.loc[cheapest].reset_index(drop=True)
+
+        options['late'] = options['lead_time'] > options['max_lead_time']
+        on_time_products = options.loc[~options['late'], 'product_id'].unique()
+        needs_fallback = ~options['product_id'].isin(on_time_products)
+
+        if self.config.allow_late_suppliers:
+            # Only the fastest suppliers are acceptable for products nobody can deliver in time
+            fastest = options[needs_fallback].groupby('product_id')['lead_time'].transform('min')
+            keep = ~options['late'] | (needs_fallback & (options['lead_time'] == fastest.reindex(options.index)))
+        else:
+            keep = ~options['late']
+
+        return options[keep].reset_index(drop=True)
+
+    def optimize(self, demand: pd.DataFrame, offers: pd.DataFrame) -> pd.DataFrame:
+        """Return one plan row per orderable product"""
+        demand = demand[demand['quantity'] > 0]
+        if demand.empty or offers.empty:
+            return pd.DataFrame(columns=PLAN_COLUMNS)
+
+        options = self.price_options(demand, offers)
+        if options.empty:
+            return pd.DataFrame(columns=PLAN_COLUMNS)
+
+        minimum_order = offers.groupby('supplier_id')['minimum_order'].max().fillna(0)
+
+        # Greedy start: every product goes to its cheapest supplier
+        plan = options.loc[options.groupby('product_id')['line_cost'].idxmin()].reset_index(drop=True)
+
+        for _ in range(self.config.max_iterations):
+            if not self._consolidate(plan, options, minimum_order):
+                break
+
+        plan = self._pad_to_minimum(plan, offers, minimum_order)
+
+        unplanned = set(demand['product_id']) - set(plan['product_id'])
+        if unplanned:
+            logger.warning(f"No supplier offer for {len(unplanned)} products")
+
+        logger.info(f"Planned {len(plan)} lines across {plan['supplier_id'].nunique()} suppliers, "
+                    f"total cost {plan['line_cost'].sum():.2f}")
+        return plan[PLAN_COLUMNS]
+
+    def _consolidate(self, plan: pd.DataFrame, options: pd.DataFrame, minimum_order: pd.Series) -> bool:
+        """Move whole orders off suppliers below their minimum when that is cheaper than padding
+
+        Mutates plan in place and returns True when any supplier was closed.
+        """
+        totals = plan.groupby('supplier_id')['line_cost'].sum()
+        shortfall = (minimum_order.reindex(totals.index).fillna(0) - totals).clip(lower=0)
+        open_suppliers = set(shortfall.index[shortfall <= 0])
+        improved = False
+
+        # Smallest orders first, they are the cheapest to absorb elsewhere
+        for supplier_id in totals[shortfall > 0].sort_values().index:
+            lines = plan[plan['supplier_id'] == supplier_id]
+            alternatives = options[
+                options['product_id'].isin(lines['product_id'])
+                & options['supplier_id'].isin(open_suppliers)
+            ]
+            if alternatives.empty:
+                continue
+
+            best = alternatives.loc[alternatives.groupby('product_id')['line_cost'].idxmin()]
+            if len(best) < len(lines):
+                continue
+
+            move_cost = best['line_cost'].sum() - lines['line_cost'].sum()
+            if move_cost < shortfall[supplier_id]:
+                replacement = best.set_index('product_id')
+                for column in replacement.columns:
+                    plan.loc[lines.index, column] = replacement.loc[lines['product_id'], column].to_numpy()
+                improved = True
+
+        return improved
+
+    def _pad_to_minimum(self, plan: pd.DataFrame, offers: pd.DataFrame, minimum_order: pd.Series) -> pd.DataFrame:
+        """Scale up quantities for suppliers whose order value is still below their minimum order
+
+        Padded lines are re-priced at the best price break their new quantity
+        reaches. A cheaper break lowers the order value again, so scaling
+        repeats until every padded order meets its minimum; each pass either
+        finishes or moves a line onto a later break, which bounds the loop.
+        """
+        plan = plan.astype({'order_quantity': float, 'unit_price': float, 'line_cost': float})
+        plan['padded_to_minimum'] = False
+        minimums = plan['supplier_id'].map(minimum_order).fillna(0)
+        breaks = offers[['product_id', 'supplier_id', 'min_quantity', 'unit_price']]
+
+        for _ in range(len(breaks) + 1):
+            totals = plan.groupby('supplier_id')['line_cost'].transform('sum')
+            short = (totals > 0) & (totals < minimums) & ~np.isclose(totals, minimums)
+            if not short.any():
+                break
+
+            plan.loc[short, 'order_quantity'] = plan.loc[short, 'order_quantity'] * minimums[short] / totals[short]
+            plan.loc[short, 'padded_to_minimum'] = True
+            plan.loc[short, 'unit_price'] = self._break_price(plan.loc[short], breaks)
+            plan['line_cost'] = plan['order_quantity'] * plan['unit_price']
+
+        return plan
+
+    @staticmethod
+    def _break_price(lines: pd.DataFrame, breaks: pd.DataFrame) -> pd.Series:
+        """Best unit price of each line's supplier among the breaks its quantity reaches"""
+        reached = lines[['product_id', 'supplier_id', 'order_quantity']].rename_axis('line').reset_index()
+        reached = reached.merge(breaks, on=['product_id', 'supplier_id'])
+        reached = reached[reached['min_quantity'].fillna(0) <= reached['order_quantity']]
+        prices = reached.groupby('line')['unit_price'].min().reindex(lines.index)
+        return prices.fillna(lines['unit_price'])
@@ -0,0 +1,173 @@
+"""
+Restocking Policy Replay for Restaurant Management
+Replays historical demand against restocking policy variants to compare stockouts, holding cost and orders
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.restocking.safety_stock_simulator import order_quantity
+
+if TYPE_CHECKING:
+    from services.restocking.restocking_service import RestockingConfig
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PolicyVariant:
+    name: str
+    safety_stock_multiplier: float = 1.0
+    reorder_point_multiplier: float = 1.0
+    lead_time_override: Optional[int] = None
+
+@dataclass
+class ReplayConfig:
+    holding_cost_rate: float = 0.001  # Fraction of unit cost per unit held per day
+    forecast_window: int = 14  # Trailing days used as the naive demand forecast
+    count_on_order: bool = True  # Use inventory position (on hand + on order) for triggers
+
+class RestockingPolicyReplay:
+    """Replays the calculate_restocking_decisions rules as (variants x products) array operations
+
+    Each day the live triggers are applied to the inventory position: order
+    when stock predicted at the end of the lead time falls to the safety level
+    (which also covers depletion within the lead time) or the position is at
+    the reorder point. The forecast is approximated by the trailing mean
+    demand, and there are no simulated order-up-to levels, so orders are sized
+    by order_quantity's safety stock plus lead-time buffer target and bumped
+    to the minimum order quantity. Receipts arrive after the lead time. Only
+    the day loop is sequential; products and policy variants advance together.
+    """
+
+    def __init__(self, config: Optional[ReplayConfig] = None):
+        self.config = config or ReplayConfig()
+
+    @staticmethod
+    def build_demand_matrix(consumption: pd.DataFrame, product_ids: List[str]) -> np.ndarray:
+        """Pivot daily consumption rows (product_id, date, consumed) into a (products x days) matrix
+
+        Calendar days without consumption are filled with zero.
+        """
+        if consumption.empty:
+            return np.zeros((len(product_ids), 0))
+
+        dates = pd.to_datetime(consumption['date'])
+        calendar = pd.date_range(dates.min(), dates.max(), freq='D')
+        matrix = consumption.assign(date=dates).pivot_table(
+            index='product_id', columns='date', values='consumed', aggfunc='sum'
+        )
+        return matrix.reindex(index=product_ids, columns=calendar).fillna(0.0).to_numpy(dtype=float)
+
+    def _trailing_mean(self, demand: np.ndarray) -> np.ndarray:
+        """Mean demand over the forecast window ending the day before each day"""
+        window = self.config.forecast_window
+        cumulative = np.concatenate([np.zeros((demand.shape[0], 1)), np.cumsum(demand, axis=1)], axis=1)
+        days = np.arange(demand.shape[1])
+        start = np.maximum(0, days - window)
+        counts = np.maximum(1, days - start)
+        return (cumulative[:, days] - cumulative[:, start]) / counts
+
+    def replay(self, demand: np.ndarray, initial_stock: np.ndarray, safety_stock: np.ndarray,
+               reorder_point: np.ndarray, lead_time: np.ndarray, minimum_order: np.ndarray,
+               unit_cost: np.ndarray, variants: List[PolicyVariant]) -> pd.DataFrame:
+        """Replay every variant over the demand matrix; per-product inputs are 1-D arrays"""
+        n_variants = len(variants)
+        n_products, n_days = demand.shape
+
+        def per_variant(values: np.ndarray, attribute: str) -> np.ndarray:
+            multipliers = np.array([getattr(v, attribute) for v in variants], dtype=float)
+            return multipliers[:, None] * values[None, :]
+
+        ss = per_variant(safety_stock, 'safety_stock_multiplier')
+        rop = per_variant(reorder_point, 'reorder_point_multiplier')
+        lead = np.stack([
+            np.full(n_products, v.lead_time_override) if v.lead_time_override is not None else lead_time
+            for v in variants
+        ]).astype(int).clip(min=1)
+
+        # Receipts are scheduled into a ring buffer indexed by arrival day
+        horizon = int(lead.max()) + 1
+        pipeline = np.zeros((n_variants, n_products, horizon))
+        variant_idx, product_idx = np.indices((n_variants, n_products))
+
+        on_hand = np.repeat(initial_stock[None, :].astype(float), n_variants, axis=0)
+        on_order = np.zeros_like(on_hand)
+        trailing = self._trailing_mean(demand)
+
+        orders = np.zeros_like(on_hand)
+        ordered_units = np.zeros_like(on_hand)
+        stockout_days = np.zeros_like(on_hand)
+        lost_units = np.zeros_like(on_hand)
+        holding_cost = np.zeros_like(on_hand)
+        on_hand_total = np.zeros_like(on_hand)
+
+        for day in range(n_days):
+            slot = day % horizon
+            arrivals = pipeline[:, :, slot]
+            on_hand += arrivals
+            on_order -= arrivals
+            pipeline[:, :, slot] = 0.0
+
+            todays_demand = demand[None, :, day]
+            served = np.minimum(on_hand, todays_demand)
+            short = todays_demand - served
+            stockout_days += short > 0
+            lost_units += short
+            on_hand -= served
+
+            position = on_hand + on_order if self.config.count_on_order else on_hand
+            predicted = position - trailing[None, :, day] * lead
+
+            # Same triggers as calculate_restocking_decisions, same sizing as calculate_order_quantity
+            trigger = (predicted <= ss) | (position <= rop) | (predicted <= 0)
+            quantity = np.where(trigger, order_quantity(position, ss, lead), 0.0)
+            quantity = np.where((quantity > 0) & (quantity < minimum_order[None, :]), minimum_order[None, :], quantity)
+
+            placed = quantity > 0
+            orders += placed
+            ordered_units += quantity
+            on_order += quantity
+            pipeline[variant_idx, product_idx, (day + lead) % horizon] += quantity
+
+            holding_cost += on_hand * unit_cost[None, :] * self.config.holding_cost_rate
+            on_hand_total += on_hand
+
+        total_demand = demand.sum()
+        results = pd.DataFrame({
+            'variant': [v.name for v in variants],
+            'orders': orders.sum(axis=1).astype(int),
+            'ordered_units': ordered_units.sum(axis=1),
+            'stockout_days': stockout_days.sum(axis=1).astype(int),
+            'lost_units': lost_units.sum(axis=1),
+            'fill_rate': 1.0 - lost_units.sum(axis=1) / total_demand if total_demand > 0 else 1.0,
+            'holding_cost': holding_cost.sum(axis=1),
+            'avg_on_hand': on_hand_total.sum(axis=1) / max(1, n_days)
+        })
+
+        logger.info(f"Replayed {n_variants} policy variants over {n_products} products and {n_days} days")
+        return results
+
+    def replay_configs(self, consumption: pd.DataFrame, initial_stock: Dict[str, float],
+                       configs: Dict[str, 'RestockingConfig'], unit_costs: Dict[str, float],
+                       variants: List[PolicyVariant]) -> pd.DataFrame:
+        """Replay variants of the given RestockingConfig values over historical consumption"""
+        product_ids = sorted(pid for pid, config in configs.items() if config.autoRestockEnabled)
+        demand = self.build_demand_matrix(consumption, product_ids)
+
+        def column(getter, default: float = 0.0) -> np.ndarray:
+            return np.array([getter(pid) or default for pid in product_ids], dtype=float)
+
+        return self.replay(
+            demand,
+            initial_stock=column(lambda pid: initial_stock.get(pid)),
+            safety_stock=column(lambda pid: configs[pid].safetyStockLevel),
+            reorder_point=column(lambda pid: configs[pid].reorderPoint),
+            lead_time=column(lambda pid: configs[pid].leadTime, default=7),
+            minimum_order=column(lambda pid: configs[pid].minimumOrderQuantity, default=1),
+            unit_cost=column(lambda pid: unit_costs.get(pid)),
+            variants=variants
+        )
@@ -0,0 +1,230 @@
+"""
+Job Leases for Restaurant Management
+Redis leases with fencing tokens so only one replica runs each scheduled job per window
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Skips the job when its window is already done or another replica holds the
+# lease; otherwise takes the lease with the next fencing token.
+# Returns {status, detail} with status 'acquired', 'completed' or 'running'.
+ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return {'completed', redis.call('GET', KEYS[2])}
+end
+local holder = redis.call('GET', KEYS[1])
+if holder then
+    return {'running', holder}
+end
+local token = redis.call('INCR', KEYS[3])
+redis.call('SET', KEYS[1], ARGV[1] .. '#' .. token, 'PX', ARGV[2])
+return {'acquired', tostring(token)}
+"""
+
+# Extends the lease only while it is still ours
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Drops the lease if still ours, first marking the window done when the run succeeded
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '1' then
+    redis.call('SET', KEYS[2], ARGV[1], 'PX', ARGV[3])
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+JOB_FENCES_DDL = """
+    CREATE TABLE IF NOT EXISTS job_fences (
+        job_name TEXT PRIMARY KEY,
+        token BIGINT NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+"""
+
+class LeaseLost(Exception):
+    """The lease expired or a newer holder took over; the run must not write"""
+
+class JobLease:
+    """Lease on one scheduled job, plus a per-window completion marker
+
+    The lease key is per job, so runs never overlap even across windows; the
+    done marker is per window, so once a run succeeds every other replica
+    skips the job until the next window starts. Each acquisition gets a
+    fencing token from a monotonic counter. `fence` records that token in the
+    same transaction as the job's writes and refuses once a newer token has
+    been recorded, so a holder that paused past its TTL cannot commit over its
+    successor's results.
+
+    If Redis is unreachable the job is skipped with status 'unavailable',
+    unless fail_open is set, in which case it runs unleased and unfenced.
+    """
+
+    def __init__(self, redis_client, job: str, window_seconds: int = 86400, ttl_seconds: float = 60.0,
+                 renew_seconds: Optional[float] = None, fail_open: bool = False, key_prefix: str = "job"):
+        self.redis_client = redis_client
+        self.job = job
+        self.window_seconds = window_seconds
+        self.ttl_seconds = ttl_seconds
+        self.renew_seconds = renew_seconds or ttl_seconds / 3
+        # Run unfenced when Redis is unreachable; only for jobs whose duplicate runs are harmless
+        self.fail_open = fail_open
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.window = int(time.time() // window_seconds)
+        self.lease_key = f"{key_prefix}:{job}:lease"
+        self.done_key = f"{key_prefix}:{job}:done:{self.window}"
+        self.fence_key = f"{key_prefix}:{job}:fence"
+
+        self.token: Optional[int] = None
+        self.value: Optional[str] = None
+        self.skip_reason: Optional[str] = None
+        self.skip_status: Optional[str] = None  # completed, running or unavailable
+        self.lost = False
+        self.renewed_at = 0.0
+        self._stopped = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+        self._fence_table_ready = False
+
+        self.acquire_script = redis_client.register_script(ACQUIRE_SCRIPT)
+        self.renew_script = redis_client.register_script(RENEW_SCRIPT)
+        self.release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+    @property
+    def ttl_ms(self) -> int:
+        return int(self.ttl_seconds * 1000)
+
+    def acquire(self) -> bool:
+        """Take the lease; False (with skip_reason set) if the job is done or running elsewhere"""
+        try:
+            status, detail = self.acquire_script(
+                keys=[self.lease_key, self.done_key, self.fence_key], args=[self.owner, self.ttl_ms]
+            )
+        except redis.RedisError as e:
+            if not self.fail_open:
+                self.skip_status, self.skip_reason = 'unavailable', f"lease unavailable: {e}"
+                return False
+            logger.warning(f"Redis unavailable for {self.job} lease, running without it: {e}")
+            return True
+
+        status, detail = (part.decode() if isinstance(part, bytes) else part for part in (status, detail))
+        if status != 'acquired':
+            self.skip_status, self.skip_reason = status, f"{status} by {detail.rsplit('#', 1)[0]}"
+            return False
+
+        self.token = int(detail)
+        self.value = f"{self.owner}#{self.token}"
+        self.renewed_at = time.monotonic()
+        return True
+
+    def start_renewal(self):
+        """Keep extending the lease from a daemon thread, so blocking work cannot starve it"""
+        if self.token is None or self._renewer is not None:
+            return
+        self._renewer = threading.Thread(target=self._renew_loop, name=f"lease-{self.job}", daemon=True)
+        self._renewer.start()
+
+    def _renew_loop(self):
+        while not self._stopped.wait(self.renew_seconds):
+            try:
+                renewed = bool(self.renew_script(keys=[self.lease_key], args=[self.value, self.ttl_ms]))
+            except redis.RedisError as e:
+                # Transient; the lease counts as lost once the TTL passes without a renewal
+                logger.warning(f"Could not renew {self.job} lease: {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                logger.error(f"Lost {self.job} lease (token {self.token})")
+                return
+            self.renewed_at = time.monotonic()
+
+    def check(self):
+        """Raise LeaseLost if this process may no longer act as the job's holder"""
+        if self.token is None:
+            return
+        if self.lost or time.monotonic() - self.renewed_at > self.ttl_seconds:
+            raise LeaseLost(f"{self.job} lease (token {self.token}) is no longer held")
+
+    def fence(self, cursor):
+        """Record this run's token in the caller's write transaction; refuse if a newer one is there
+
+        Call it on the cursor that writes the job's results, before the
+        writes. The upsert locks the job's fence row until that transaction
+        ends, so a successor's fence waits for it to commit, and a superseded
+        holder raises LeaseLost before writing; the caller rolls back.
+        """
+        self.check()
+        if self.token is None:
+            return
+
+        if not self._fence_table_ready:
+            cursor.execute(JOB_FENCES_DDL)
+            self._fence_table_ready = True
+        cursor.execute("""
+            INSERT INTO job_fences (job_name, token, updated_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (job_name) DO UPDATE SET
+            token = EXCLUDED.token,
+            updated_at = EXCLUDED.updated_at
+            WHERE job_fences.token <= EXCLUDED.token
+        """, (self.job, self.token))
+
+        if cursor.rowcount == 0:
+            self.lost = True
+            raise LeaseLost(f"{self.job} token {self.token} was superseded by a newer holder")
+
+    def release(self, completed: bool):
+        """Stop renewing and drop the lease, marking the window done if the run completed"""
+        self._stopped.set()
+        if self.token is None:
+            return
+
+        window_left = (self.window + 1) * self.window_seconds - time.time()
+        try:
+            self.release_script(
+                keys=[self.lease_key, self.done_key],
+                args=[self.value, '1' if completed and not self.lost else '0', max(int(window_left * 1000), 1)]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Could not release {self.job} lease, it expires in {self.ttl_seconds:.0f}s: {e}")
+
+async def run_exclusive(lease: JobLease, job: Callable[[JobLease], Awaitable[T]],
+                        succeeded: Callable[[T], bool] = lambda result: result is not None
+                        ) -> Union[T, Dict[str, Any]]:
+    """Run `job(lease)` only if the lease is acquired
+
+    Otherwise return {'skipped': reason, 'status': status} at once, where status
+    is 'completed' (the window is already done), 'running' (another replica
+    holds the lease) or 'unavailable' (Redis is down and fail_open is off).
+    """
+    if not lease.acquire():
+        logger.info(f"Skipping {lease.job} for this window: {lease.skip_reason}")
+        return {'skipped': lease.skip_reason, 'status': lease.skip_status}
+
+    lease.start_renewal()
+    completed = False
+    try:
+        result = await job(lease)
+        completed = succeeded(result)
+        return result
+    finally:
+        lease.release(completed)
@@ -0,0 +1,535 @@
+"""
+Storage Backends for Restaurant Management
+Lets every service run against Postgres or an embedded SQLite database through one connection interface
+"""
+
+import os
+import re
+import sqlite3
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class StorageBackend(ABC):
+    """Connection factory the services query through
+
+    Connections are DB-API connections whose cursors return rows indexable by
+    column name and accept the psycopg2 (%s / %(name)s) parameter style.
+    """
+
+    dialect = 'postgres'
+    supports_notify = False
+
+    @abstractmethod
+    def connect(self):
+        """Open a connection; close() releases it"""
+
+    def init_pool(self, minconn: int = 1, maxconn: int = 8):
+        """Share connections between concurrent callers; a no-op where connections are cheap"""
+
+    def stream_cursor(self, conn, name: str):
+        """Cursor for reading large results in batches with fetchmany"""
+        return conn.cursor()
+
+    @abstractmethod
+    def bulk_insert(self, cursor, query: str, rows: List[Sequence[Any]], page_size: int = 500):
+        """Run an INSERT ... VALUES %s statement for every row"""
+
+class PooledConnection:
+    """Pool-backed connection whose close() hands it back to the pool"""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = pool.getconn()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.rollback()
+            self._pool.putconn(self._conn)
+            self._conn = None
+
+class PostgresBackend(StorageBackend):
+    """psycopg2-backed storage; the driver is only imported when this backend is used"""
+
+    dialect = 'postgres'
+    supports_notify = True
+
+    def __init__(self, db_url: str):
+        self.db_url = db_url
+        self.pool = None
+
+    def connect(self):
+        import psycopg2
+        from psycopg2.extras import RealDictCursor
+
+        if self.pool is not None:
+            return PooledConnection(self.pool)
+        return psycopg2.connect(self.db_url, cursor_factory=RealDictCursor)
+
+    def init_pool(self, minconn: int = 1, maxconn: int = 8):
+        from psycopg2.extras import RealDictCursor
+        from psycopg2.pool import ThreadedConnectionPool
+
+        if self.pool is None:
+            self.pool = ThreadedConnectionPool(minconn, maxconn, self.db_url, cursor_factory=RealDictCursor)
+
+    def stream_cursor(self, conn, name: str):
+        # Named cursors stream rows from the server instead of materialising them
+        return conn.cursor(name=name)
+
+    def bulk_insert(self, cursor, query: str, rows: List[Sequence[Any]], page_size: int = 500):
+        from psycopg2.extras import execute_values
+
+        execute_values(cursor, query, rows, page_size=page_size)
+
+# Tables the services read and write, for databases the services create themselves
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS suppliers (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        lead_time INTEGER,
+        minimum_order NUMERIC,
+        payment_terms TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS products (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        quantity NUMERIC,
+        current_stock NUMERIC,
+        safety_stock NUMERIC,
+        reorder_point NUMERIC,
+        lead_time INTEGER,
+        auto_restock_enabled BOOLEAN DEFAULT FALSE,
+        forecast_accuracy NUMERIC,
+        cost NUMERIC,
+        supplier_id TEXT REFERENCES suppliers (id),
+        is_active BOOLEAN DEFAULT TRUE
+    );
+
+    CREATE TABLE IF NOT EXISTS supplier_price_breaks (
+        supplier_id TEXT NOT NULL REFERENCES suppliers (id),
+        product_id TEXT NOT NULL REFERENCES products (id),
+        min_quantity NUMERIC NOT NULL,
+        unit_price NUMERIC NOT NULL,
+        PRIMARY KEY (supplier_id, product_id, min_quantity)
+    );
+
+    CREATE TABLE IF NOT EXISTS recipes (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE
+    );
+
+    CREATE TABLE IF NOT EXISTS recipe_ingredients (
+        recipe_id TEXT NOT NULL REFERENCES recipes (id),
+        product_id TEXT NOT NULL REFERENCES products (id),
+        quantity NUMERIC NOT NULL,
+        PRIMARY KEY (recipe_id, product_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS sales (
+        id INTEGER PRIMARY KEY,
+        recipe_id TEXT NOT NULL REFERENCES recipes (id),
+        date TIMESTAMP NOT NULL,
+        quantity NUMERIC NOT NULL,
+        price NUMERIC
+    );
+    CREATE INDEX IF NOT EXISTS sales_date_idx ON sales (date);
+    CREATE INDEX IF NOT EXISTS sales_recipe_date_idx ON sales (recipe_id, date);
+
+    CREATE TABLE IF NOT EXISTS inventory_history (
+        id INTEGER PRIMARY KEY,
+        product_id TEXT NOT NULL REFERENCES products (id),
+        created_at TIMESTAMP NOT NULL,
+        current_stock NUMERIC,
+        quantity NUMERIC NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS inventory_history_created_idx ON inventory_history (created_at);
+    CREATE INDEX IF NOT EXISTS inventory_history_product_idx ON inventory_history (product_id, created_at);
+
+    CREATE TABLE IF NOT EXISTS waste_logs (
+        id INTEGER PRIMARY KEY,
+        product_id TEXT NOT NULL REFERENCES products (id),
+        date TIMESTAMP NOT NULL,
+        quantity NUMERIC NOT NULL,
+        cost NUMERIC,
+        reason TEXT
+    );
+    CREATE INDEX IF NOT EXISTS waste_logs_date_idx ON waste_logs (date);
+
+    CREATE TABLE IF NOT EXISTS sales_forecasts (
+        id TEXT PRIMARY KEY,
+        recipe_id TEXT NOT NULL,
+        recipe_name TEXT,
+        date DATE NOT NULL,
+        predicted_quantity NUMERIC,
+        confidence_lower NUMERIC,
+        confidence_upper NUMERIC,
+        model_type TEXT,
+        accuracy NUMERIC,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS inventory_forecasts (
+        id TEXT PRIMARY KEY,
+        product_id TEXT NOT NULL,
+        product_name TEXT,
+        date DATE NOT NULL,
+        predicted_stock NUMERIC,
+        depletion_date DATE,
+        reorder_date DATE,
+        suggested_order_quantity NUMERIC,
+        confidence_level NUMERIC,
+        model_type TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS inventory_forecasts_date_idx ON inventory_forecasts (date);
+
+    CREATE TABLE IF NOT EXISTS restocking_decisions (
+        id TEXT PRIMARY KEY,
+        product_id TEXT NOT NULL,
+        product_name TEXT,
+        decision TEXT,
+        trigger_reason TEXT,
+        current_stock NUMERIC,
+        forecasted_demand NUMERIC,
+        suggested_order_quantity NUMERIC,
+        safety_stock_level NUMERIC,
+        lead_time INTEGER,
+        confidence NUMERIC,
+        reasoning TEXT,
+        cost_estimate NUMERIC,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS purchase_orders (
+        id TEXT PRIMARY KEY,
+        supplier_id TEXT,
+        supplier_name TEXT,
+        status TEXT NOT NULL,
+        total_cost NUMERIC,
+        order_date TIMESTAMP,
+        expected_delivery_date TIMESTAMP,
+        auto_generated BOOLEAN,
+        trigger_reason TEXT,
+        approved_by TEXT,
+        approved_at TIMESTAMP,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS purchase_order_items (
+        id TEXT PRIMARY KEY,
+        purchase_order_id TEXT NOT NULL REFERENCES purchase_orders (id),
+        product_id TEXT,
+        product_name TEXT,
+        quantity NUMERIC,
+        unit_cost NUMERIC,
+        total_cost NUMERIC,
+        created_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS purchase_order_items_order_idx ON purchase_order_items (purchase_order_id);
+
+    CREATE TABLE IF NOT EXISTS anomalies (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        severity TEXT,
+        status TEXT,
+        title TEXT,
+        description TEXT,
+        affected_items TEXT,
+        expected_value NUMERIC,
+        actual_value NUMERIC,
+        deviation NUMERIC,
+        z_score NUMERIC,
+        cost_impact NUMERIC,
+        suggested_actions TEXT,
+        detected_at TIMESTAMP,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS anomaly_config (
+        type TEXT PRIMARY KEY,
+        enabled BOOLEAN DEFAULT TRUE,
+        thresholds TEXT,
+        channels TEXT,
+        recipients TEXT,
+        updated_at TIMESTAMP
+    );
+"""
+
+# Postgres constructs used by the services -> SQLite equivalents. Parameters keep
+# their psycopg2 form here and are converted afterwards.
+_PARAM = r"(%s|%\(\w+\)s)"
+SQLITE_REWRITES = [
+    (re.compile(r"NOW\(\)\s*([-+])\s*INTERVAL\s*'%s days?'", re.I),
+     r"datetime('now', 'localtime', '\1' || %s || ' days')"),
+    (re.compile(rf"NOW\(\)\s*([-+])\s*{_PARAM}\s*\*\s*INTERVAL\s*'1 day'", re.I),
+     r"datetime('now', 'localtime', '\1' || \2 || ' days')"),
+    (re.compile(r"NOW\(\)\s*([-+])\s*INTERVAL\s*'(\d+) days?'", re.I),
+     r"datetime('now', 'localtime', '\1\2 days')"),
+    (re.compile(rf"CURRENT_DATE\s*([-+])\s*{_PARAM}", re.I),
+     r"date('now', 'localtime', '\1' || \2 || ' days')"),
+    (re.compile(r"\bCURRENT_DATE\b", re.I), r"date('now', 'localtime')"),
+    (re.compile(r"DATE_TRUNC\('hour',\s*([\w.]+(?:\(\))?)\)", re.I), r"strftime('%Y-%m-%d %H:00:00', \1)"),
+    (re.compile(r"DEFAULT\s+NOW\(\)", re.I), r"DEFAULT (datetime('now', 'localtime'))"),
+    (re.compile(r"\bNOW\(\)", re.I), r"datetime('now', 'localtime')"),
+    # First element of an ordered ARRAY_AGG -> value at the extreme ordering key
+    (re.compile(r"\(ARRAY_AGG\((.+?)\s+ORDER BY\s+(.+?)\s+DESC\)\)\[1\]", re.I), r"LAST_BY(\1, \2)"),
+    (re.compile(r"\(ARRAY_AGG\((.+?)\s+ORDER BY\s+(.+?)(?:\s+ASC)?\)\)\[1\]", re.I), r"FIRST_BY(\1, \2)")
+]
+
+_PLACEHOLDER = re.compile(r"=\s*ANY\(%s\)|%\((\w+)\)s|%s|%%", re.I)
+
+# Result columns holding dates or timestamps, by the naming convention the schema uses
+_TEMPORAL_COLUMN = re.compile(r"^(date|ds|.+_date|.+_at|.+_through)$")
+
+def translate_sqlite(query: str, params: Any = None):
+    """Rewrite a Postgres query and its psycopg2 parameters for SQLite
+
+    `= ANY(%s)` with a list parameter becomes an IN list of that length.
+    Without parameters the placeholders are left alone, as psycopg2 does.
+    """
+    for pattern, replacement in SQLITE_REWRITES:
+        query = pattern.sub(replacement, query)
+
+    if params is None:
+        return query, ()
+
+    if isinstance(params, dict):
+        def named(match):
+            token = match.group(0)
+            return f":{match.group(1)}" if match.group(1) else '%' if token == '%%' else '?'
+
+        return _PLACEHOLDER.sub(named, query), params
+
+    positional = list(params or [])
+    translated: List[Any] = []
+    index = 0
+
+    def placeholder(match):
+        nonlocal index
+        token = match.group(0)
+        if token == '%%':
+            return '%'
+        value = positional[index]
+        index += 1
+        if token.upper().startswith('='):
+            values = list(value)
+            translated.extend(values)
+            return f"IN ({', '.join('?' * len(values))})"
+        translated.append(value)
+        return '?'
+
+    return _PLACEHOLDER.sub(placeholder, query), translated
+
+def _parse_temporal(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+class Row(tuple):
+    """Result row that iterates like a tuple (as pandas expects) and indexes like a dict"""
+
+    __slots__ = ()
+    _index: Dict[str, int] = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+
+    def keys(self):
+        return self._index.keys()
+
+    def items(self):
+        return zip(self._index, self)
+
+@lru_cache(maxsize=1024)
+def _row_class(columns: tuple):
+    temporal = tuple(i for i, column in enumerate(columns) if _TEMPORAL_COLUMN.match(column))
+    index = {column: i for i, column in enumerate(columns)}
+    return type('Row', (Row,), {'__slots__': (), '_index': index, '_temporal': temporal})
+
+def _make_row(cursor, row) -> Row:
+    row_class = _row_class(tuple(column[0] for column in cursor.description))
+    if row_class._temporal:
+        row = list(row)
+        for i in row_class._temporal:
+            row[i] = _parse_temporal(row[i])
+    return row_class(row)
+
+class _FirstBy:
+    """Aggregate returning the value at the smallest ordering key"""
+
+    def __init__(self):
+        self.key = None
+        self.value = None
+
+    def step(self, value, key):
+        if key is not None and (self.key is None or key < self.key):
+            self.key, self.value = key, value
+
+    def finalize(self):
+        return self.value
+
+class _LastBy(_FirstBy):
+    """Aggregate returning the value at the largest ordering key"""
+
+    def step(self, value, key):
+        if key is not None and (self.key is None or key >= self.key):
+            self.key, self.value = key, value
+
+for _type, _adapt in [
+    (datetime, lambda v: v.isoformat(' ')),
+    (pd.Timestamp, lambda v: v.isoformat(' ')),
+    (date, lambda v: v.isoformat()),
+    (Decimal, float),
+    (np.int32, int),
+    (np.int64, int),
+    (np.float32, float),
+    (np.bool_, bool)
+]:
+    sqlite3.register_adapter(_type, _adapt)
+
+sqlite3.register_converter('BOOLEAN', lambda v: v not in (b'0', b''))
+sqlite3.register_converter('DATE', lambda v: _parse_temporal(v.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda v: _parse_temporal(v.decode()))
+
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, query: str, params: Any = None):
+        sql, values = translate_sqlite(query, params)
+        if params is None and sql.strip().rstrip(';').count(';'):
+            # DDL batches such as SQLITE_SCHEMA or the anomaly rollup tables
+            self._cursor.executescript(sql)
+        else:
+            self._cursor.execute(sql, values)
+        return self
+
+    def executemany(self, query: str, seq_of_params):
+        rows = list(seq_of_params)
+        if rows:
+            sql, _ = translate_sqlite(query, rows[0])
+            self._cursor.executemany(sql, rows)
+        return self
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """sqlite3 connection that accepts the Postgres queries the services issue"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, name: Optional[str] = None) -> SQLiteCursor:
+        return SQLiteCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-file database for single-location installs, benchmarks and tests
+
+    ':memory:' gives a private in-memory database shared by every connection
+    of this backend for as long as the backend exists.
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path: str, create_schema: bool = True):
+        if path == ':memory:':
+            self.database = f"file:restaurant_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.database = f"file:{path}"
+        self.path = path
+        self._anchor = None
+
+        if path == ':memory:':
+            # The in-memory database lives only while a connection is open
+            self._anchor = self.connect()
+        else:
+            conn = self.connect()
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.close()
+
+        if create_schema:
+            conn = self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute(SQLITE_SCHEMA)
+            conn.commit()
+            conn.close()
+
+    def connect(self) -> SQLiteConnection:
+        conn = sqlite3.connect(
+            self.database, uri=True, timeout=30, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        conn.row_factory = _make_row
+        conn.create_aggregate('FIRST_BY', 2, _FirstBy)
+        conn.create_aggregate('LAST_BY', 2, _LastBy)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return SQLiteConnection(conn)
+
+    def bulk_insert(self, cursor, query: str, rows: List[Sequence[Any]], page_size: int = 500):
+        if not rows:
+            return
+        values = f"VALUES ({', '.join(['%s'] * len(rows[0]))})"
+        cursor.executemany(query.replace('VALUES %s', values, 1), rows)
+
+SQLITE_URL_PREFIX = 'sqlite:///'
+
+def storage_from_url(db_url: str) -> StorageBackend:
+    """sqlite:///path/to/file.db (or sqlite:///:memory:) selects the embedded backend"""
+    if db_url.startswith(SQLITE_URL_PREFIX):
+        return SQLiteBackend(db_url[len(SQLITE_URL_PREFIX):] or ':memory:')
+    return PostgresBackend(db_url)
@@ -0,0 +1,73 @@
+"""
+Shared fixtures for the service tests
+Every test runs against a private in-memory SQLite database built from SQLITE_SCHEMA
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root and the service directories to the path
+sys.path.append(os.path.dirname(SERVICES_DIR))
+for directory in ['forecasting', 'restocking', 'anomaly-detection']:
+    sys.path.append(os.path.join(SERVICES_DIR, directory))
+
+def days_ago(days: float) -> datetime:
+    return datetime.now() - timedelta(days=days)
+
+@pytest.fixture
+def storage():
+    from services.shared.storage import SQLiteBackend
+
+    return SQLiteBackend(':memory:')
+
+@pytest.fixture
+def redis_client():
+    """In-process Redis; the lease and stream code paths run their real commands and Lua scripts"""
+    fakeredis = pytest.importorskip('fakeredis')
+
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+@pytest.fixture
+def seeded(storage):
+    """Two suppliers, three products, one recipe and a few days of history"""
+    conn = storage.connect()
+    with conn.cursor() as cursor:
+        storage.bulk_insert(cursor, "INSERT INTO suppliers (id, name, lead_time, minimum_order) VALUES %s", [
+            ('s1', 'Fresh Farms', 2, 100.0),
+            ('s2', 'Bulk Foods', 5, 0.0)
+        ])
+        storage.bulk_insert(cursor, """
+            INSERT INTO products (id, name, current_stock, safety_stock, reorder_point, lead_time,
+                                  auto_restock_enabled, cost, supplier_id, is_active)
+            VALUES %s
+        """, [
+            ('p1', 'Tomatoes', 5, 10, 20, 2, True, 2.0, 's1', True),
+            ('p2', 'Flour', 50, 10, 20, 5, True, 1.0, 's2', True),
+            ('p3', 'Basil', 1, 2, 4, 2, False, 8.0, 's1', True)
+        ])
+        storage.bulk_insert(cursor, "INSERT INTO supplier_price_breaks VALUES %s", [
+            ('s2', 'p1', 0, 2.5),
+            ('s2', 'p1', 50, 1.5)
+        ])
+        cursor.execute("INSERT INTO recipes (id, name) VALUES ('r1', 'Margherita')")
+        storage.bulk_insert(cursor, "INSERT INTO sales (recipe_id, date, quantity, price) VALUES %s", [
+            ('r1', days_ago(1), 3, 12.0),
+            ('r1', days_ago(2), 4, 12.0),
+            ('r1', days_ago(40), 9, 12.0)
+        ])
+        storage.bulk_insert(cursor, """
+            INSERT INTO inventory_history (product_id, created_at, current_stock, quantity) VALUES %s
+        """, [
+            ('p1', days_ago(2).replace(hour=8), 30, 10),
+            ('p1', days_ago(2).replace(hour=12), 26, -4),
+            ('p1', days_ago(2).replace(hour=18), 21, -5),
+            ('p1', days_ago(40), 50, -1)
+        ])
+    conn.commit()
+    conn.close()
+    return storage
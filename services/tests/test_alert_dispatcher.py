@@ -0,0 +1,57 @@
+"""
+Alert dispatcher
+Deduplication claims, batched in-app alerts and rate-limited channel sends
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from alert_dispatcher import AlertDispatcher, RateLimiter
+
+def test_claims_deduplicate_until_released(redis_client):
+    dispatcher = AlertDispatcher(redis_client)
+
+    assert dispatcher.claim_new(['a', 'b']) == [True, True]
+    # Another replica, or a later run within the TTL
+    assert AlertDispatcher(redis_client).claim_new(['a', 'b', 'c']) == [False, False, True]
+
+    # 'b' was never delivered, so its claim is dropped and it can be sent later
+    dispatcher.release(['b'])
+    assert dispatcher.claim_new(['a', 'b']) == [False, True]
+    assert 0 < redis_client.ttl('alert:fingerprint:a') <= dispatcher.dedup_ttl
+
+def test_in_app_alerts_are_pushed_together(redis_client):
+    dispatcher = AlertDispatcher(redis_client, alerts_ttl=60)
+    dispatcher.push_in_app([{'title': 'one'}, {'title': 'two'}])
+    dispatcher.push_in_app([])
+
+    assert [json.loads(alert)['title'] for alert in redis_client.lrange('alerts', 0, -1)] == ['two', 'one']
+    assert 0 < redis_client.ttl('alerts') <= 60
+
+def test_send_all_reports_each_delivery(redis_client):
+    dispatcher = AlertDispatcher(redis_client, rate_limits={'email': 1000.0})
+
+    async def send(item):
+        if item == 'bounce':
+            raise ConnectionError("SMTP unavailable")
+        return item != 'rejected'
+
+    delivered = asyncio.run(dispatcher.send_all('email', send, ['ok', 'bounce', 'rejected', 'ok']))
+
+    assert delivered == [True, False, False, True]
+
+def test_rate_limiter_paces_concurrent_sends():
+    limiter = RateLimiter(rate=20.0)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+        return loop.time() - started
+
+    # One token up front, then one every 50ms
+    assert asyncio.run(run()) == pytest.approx(0.2, abs=0.08)
+    # A new event loop gets a fresh lock instead of failing
+    assert asyncio.run(run()) < 0.5
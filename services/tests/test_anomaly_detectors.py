@@ -0,0 +1,126 @@
+"""
+Batch anomaly detectors
+Each detector scores every series of a day's frames in one vectorised pass
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from anomaly_service import AnomalyDetectionService, AnomalyType, Severity
+from conftest import days_ago
+
+DAY_1, DAY_2 = date(2026, 3, 2), date(2026, 3, 3)
+
+@pytest.fixture
+def service(seeded):
+    return AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+
+def test_theft_indicators_compare_consumption_with_recipe_usage(service):
+    sales = pd.DataFrame({'date': [DAY_1, DAY_2], 'recipe_id': 'r1', 'total_quantity': [10, 10]})
+    ingredients = pd.DataFrame({'recipe_id': ['r1'], 'product_id': ['p1'], 'ingredient_quantity': [0.5]})
+    inventory = pd.DataFrame({
+        'product_id': 'p1', 'product_name': 'Tomatoes', 'date': [DAY_1, DAY_2, DAY_2, DAY_2],
+        'change_type': ['consumption', 'consumption', 'consumption', 'restock'],
+        'change_amount': [-5.5, -4.0, -6.0, 20.0]
+    })
+
+    anomalies = service.detect_theft_indicators(inventory, sales, ingredients)
+
+    # Day 1 is within normal variation; day 2 used twice the recipe quantity
+    assert [(a.type, a.severity, a.date) for a in anomalies] == [
+        (AnomalyType.THEFT_INDICATOR, Severity.HIGH, str(DAY_2))
+    ]
+    assert anomalies[0].metrics['expected'] == pytest.approx(5.0)
+    assert anomalies[0].metrics['actual'] == pytest.approx(10.0)
+    # Five units over, at the catalogue cost of 2.0
+    assert anomalies[0].cost_impact == pytest.approx(10.0)
+
+def test_theft_indicators_need_recipes_for_the_products(service):
+    sales = pd.DataFrame({'date': [DAY_1], 'recipe_id': 'r1', 'total_quantity': [10]})
+    inventory = pd.DataFrame({
+        'product_id': ['p2'], 'product_name': ['Flour'], 'date': [DAY_1],
+        'change_type': ['consumption'], 'change_amount': [-50.0]
+    })
+    ingredients = pd.DataFrame({'recipe_id': ['r1'], 'product_id': ['p1'], 'ingredient_quantity': [0.5]})
+
+    assert service.detect_theft_indicators(inventory, sales, ingredients) == []
+
+def test_sales_z_scores_are_computed_per_recipe(service):
+    days = pd.date_range('2026-03-01', periods=10).date
+    sales = pd.concat([
+        pd.DataFrame({'recipe_id': recipe_id, 'recipe_name': name, 'date': days, 'total_quantity': quantities})
+        for recipe_id, name, quantities in [
+            ('r1', 'Margherita', [10] * 9 + [40]),
+            ('r2', 'Calzone', [20] * 9 + [2]),
+            ('r3', 'Focaccia', [5] * 10)
+        ]
+    ], ignore_index=True).assign(avg_price=12.0)
+    sales['total_revenue'] = sales['total_quantity'] * 12.0
+
+    anomalies = service.detect_sales_anomalies(sales)
+
+    # A steady recipe has no spread and is never flagged; a spike elsewhere does not move it
+    assert [(a.type, a.severity, a.affected_items, a.date) for a in anomalies] == [
+        (AnomalyType.SALES_SPIKE, Severity.MEDIUM, ['r1'], str(days[-1])),
+        (AnomalyType.SALES_DROP, Severity.MEDIUM, ['r2'], str(days[-1]))
+    ]
+    assert anomalies[0].metrics['expected'] == pytest.approx(13.0)
+    assert anomalies[0].z_score == pytest.approx(-anomalies[1].z_score) == pytest.approx(27 / 90 ** 0.5)
+    # Revenue above the recipe's mean day
+    assert anomalies[0].cost_impact == pytest.approx(480.0 - 13.0 * 12.0)
+
+    stricter = service.detect_sales_anomalies(sales, thresholds={'zScoreThreshold': 2.0, 'highZScoreThreshold': 2.5})
+    assert [a.severity for a in stricter] == [Severity.HIGH, Severity.HIGH]
+    assert service.detect_sales_anomalies(sales.iloc[:0]) == []
+
+def test_over_portioning_windows_cover_calendar_days(service):
+    days = pd.date_range('2026-03-01', periods=9)
+    consumed = {'p1': [4, 6, 4, 6, 4, 6, 4, None, 20], 'p2': [10, 11, 10, 11, 10, 11, 10, 11, 10]}
+    inventory = pd.DataFrame([
+        {'product_id': product_id, 'product_name': product_id.upper(), 'date': day.date(),
+         'change_type': 'consumption', 'change_amount': -amount}
+        for product_id, amounts in consumed.items() for day, amount in zip(days, amounts) if amount is not None
+    ] + [{'product_id': 'p1', 'product_name': 'P1', 'date': days[8].date(), 'change_type': 'restock',
+          'change_amount': 50.0}])
+
+    anomalies = service.detect_over_portioning(inventory)
+
+    assert [(a.type, a.affected_items, a.date) for a in anomalies] == [
+        (AnomalyType.OVER_PORTIONING, ['p1'], '2026-03-09')
+    ]
+    # The day without consumption counts as zero in the preceding seven days; restocks are ignored
+    assert anomalies[0].metrics['expected'] == pytest.approx(30 / 7)
+    assert anomalies[0].metrics['actual'] == pytest.approx(20.0)
+    # Units over the window mean at p1's catalogue cost of 2.0
+    assert anomalies[0].cost_impact == pytest.approx((20 - 30 / 7) * 2.0)
+
+    # Too few days for a full window
+    assert service.detect_over_portioning(inventory[inventory['date'] < days[7].date()]) == []
+
+def test_waste_spikes_name_their_dominant_reason(seeded):
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        seeded.bulk_insert(cursor, "INSERT INTO waste_logs (product_id, date, quantity, cost, reason) VALUES %s", [
+            ('p1', days_ago(day), 2, 4.0, 'expired') for day in range(2, 11)
+        ] + [
+            ('p1', days_ago(1), 12, 24.0, 'spoilage'),
+            ('p1', days_ago(1), 4, 8.0, 'expired')
+        ])
+    conn.commit()
+    conn.close()
+    service = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded,
+                                      use_rollups=False)
+
+    totals, reasons = service.get_waste_analytics(days=30)
+    assert len(totals) == 10 and totals['total_waste'].sum() == reasons['total_waste'].sum() == 34
+
+    anomalies = service.detect_waste_anomalies(totals, reasons)
+    assert [(a.type, a.affected_items) for a in anomalies] == [(AnomalyType.WASTE_SPIKE, ['p1'])]
+    assert anomalies[0].metrics['actual'] == 16 and anomalies[0].cost_impact == pytest.approx(32.0)
+    assert 'mostly spoilage (75%)' in anomalies[0].description
+    assert anomalies[0].suggested_actions[0] == "Check storage temperatures and stock rotation"
+
+    # Without the breakdown the spike is still reported
+    assert 'mostly' not in service.detect_waste_anomalies(totals)[0].description
@@ -0,0 +1,119 @@
+"""
+Anomaly detection job
+Stage execution, incremental scanning over daily rollups and anomaly persistence
+"""
+
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from anomaly_service import AnomalyDetectionService, AnomalyResult, AnomalyType, Severity
+from conftest import days_ago
+
+@pytest.fixture
+def service(seeded):
+    return AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+
+def test_stages_run_concurrently_off_the_event_loop(service):
+    loop_thread = threading.get_ident()
+    threads = {}
+
+    def stage(name, seconds=0.2):
+        def run():
+            threads[name] = threading.get_ident()
+            time.sleep(seconds)
+            return name
+        return run
+
+    def broken():
+        raise ValueError("no data")
+
+    report = {}
+    started = time.perf_counter()
+    results = asyncio.run(service.run_stages({'a': stage('a'), 'b': stage('b'), 'broken': broken}, report, True))
+    elapsed = time.perf_counter() - started
+
+    # A failing stage is reported; the others still complete
+    assert results == {'a': 'a', 'b': 'b', 'broken': None}
+    assert report['broken']['error'] == "no data" and report['a']['error'] is None
+    assert report['a']['seconds'] >= 0.2 and elapsed < 0.35
+    assert loop_thread not in threads.values()
+
+def test_sequential_stages_keep_their_order(service):
+    order = []
+
+    def stage(name):
+        def run():
+            order.append(name)
+            return len(order)
+        return run
+
+    report = {}
+    results = asyncio.run(service.run_stages({name: stage(name) for name in 'xyz'}, report, False))
+
+    assert order == ['x', 'y', 'z'] and results == {'x': 1, 'y': 2, 'z': 3}
+    assert list(report) == ['x', 'y', 'z']
+
+def anomaly(day, kind=AnomalyType.SALES_SPIKE, items=('r1',), z_score=2.5):
+    return AnomalyResult(
+        type=kind, severity=Severity.MEDIUM, title="Spike", description="", affected_items=list(items),
+        metrics={'expected': 10.0, 'actual': 20.0, 'deviation': 10.0, 'z_score': z_score}, cost_impact=None,
+        suggested_actions=[], z_score=z_score, confidence=0.6, date=day
+    )
+
+def test_only_completed_days_after_the_last_scan_are_kept(service):
+    today, scored_through = date(2026, 3, 10), date(2026, 3, 7)
+    found = [anomaly(day) for day in ['2026-03-07', '2026-03-08', '2026-03-09T00:00:00', '2026-03-10']]
+
+    kept = service.filter_new_days(found + [anomaly(None)], scored_through, today)
+    assert [a.date for a in kept] == ['2026-03-08', '2026-03-09T00:00:00', None]
+    # First run: everything before today
+    assert len(service.filter_new_days(found, None, today)) == 3
+
+def test_rollups_pick_up_late_rows_for_the_last_rolled_day(service, seeded):
+    assert asyncio.run(service.ensure_rollup_tables()) and asyncio.run(service.refresh_rollups())
+    assert asyncio.run(service.get_scored_through()) is None
+
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO sales (recipe_id, date, quantity, price) VALUES ('r1', %s, 5, 12.0)", [days_ago(0)])
+    conn.commit()
+    conn.close()
+    assert service.get_sales_data(days=30)['total_quantity'].sum() == 7
+
+    # Only the last rolled-up day onwards is re-aggregated, so the late sale is added
+    assert asyncio.run(service.refresh_rollups())
+    assert service.get_sales_data(days=30)['total_quantity'].sum() == 12
+
+    assert asyncio.run(service.set_scored_through(date.today() - timedelta(days=1)))
+    assert str(asyncio.run(service.get_scored_through())) == str(date.today() - timedelta(days=1))
+
+def test_redetected_anomalies_update_their_row(service, seeded):
+    first = asyncio.run(service.save_anomalies([anomaly('2026-03-08'), anomaly('2026-03-08', items=('r2',))]))
+
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        cursor.execute("UPDATE anomalies SET status = 'acknowledged' WHERE id = %s", [first[0]])
+    conn.commit()
+    conn.close()
+
+    # Same type, items and day: the same ID, whatever the order of affected items
+    again = asyncio.run(service.save_anomalies([
+        anomaly('2026-03-08', z_score=3.5), anomaly('2026-03-08', items=('r2',)),
+        anomaly('2026-03-09'), anomaly('2026-03-09', kind=AnomalyType.SALES_DROP),
+        anomaly('2026-03-10', items=('a', 'b')), anomaly('2026-03-10', items=('b', 'a'))
+    ]))
+    assert again[:2] == first and len(again) == 5
+
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id, status, z_score FROM anomalies ORDER BY id")
+        rows = {row['id']: (row['status'], row['z_score']) for row in cursor.fetchall()}
+    conn.close()
+
+    assert len(rows) == 5
+    # The newer reading is kept, the triage status is not reset
+    assert rows[first[0]] == ('acknowledged', 3.5)
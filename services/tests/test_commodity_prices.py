@@ -0,0 +1,81 @@
+"""
+Commodity prices
+As-of price lookups for whole arrays of products, served from an expiring LRU cache
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.shared.commodity_prices import CommodityPriceService, PriceCache, PriceHistory
+
+def history(price):
+    return PriceHistory(loaded_at=0.0, days=np.array([0]), prices=np.array([price]), fallback=np.nan)
+
+@pytest.fixture
+def prices(seeded):
+    service = CommodityPriceService(seeded)
+    today = date.today()
+    service.write_prices(pd.DataFrame({
+        'product_id': ['p1', 'p1', 'p2'],
+        'date': [today - timedelta(days=20), today - timedelta(days=5), today - timedelta(days=10)],
+        'price': [2.5, 3.0, 1.2]
+    }), 'test')
+    return service
+
+def test_cache_evicts_the_least_recently_used_and_expires():
+    cache = PriceCache(max_products=2, ttl_seconds=60)
+    cache.put_many({'a': history(1.0), 'b': history(2.0)})
+    for entry in cache.entries.values():
+        entry.loaded_at = float('inf')
+    cache.get_many(['a'])
+    cache.put_many({'c': history(3.0)})
+
+    assert list(cache.entries) == ['a', 'c']
+    # Entries loaded longer ago than the TTL are misses
+    assert list(cache.get_many(['a', 'c'])) == ['a']
+
+    cache.invalidate(['a'])
+    assert list(cache.entries) == ['c']
+    cache.invalidate()
+    assert not cache.entries
+
+def test_lookup_returns_the_price_in_effect_on_each_date(prices):
+    today = date.today()
+
+    found = prices.lookup(
+        ['p1', 'p1', 'p1', 'p2', 'p3', 'unknown'],
+        as_of=[today, today - timedelta(days=10), today - timedelta(days=30), today, today, today]
+    )
+
+    # Before its first price a product falls back to its catalogue cost; p3 has only that
+    np.testing.assert_allclose(found[:5], [3.0, 2.5, 2.0, 1.2, 8.0])
+    assert np.isnan(found[5])
+    assert prices.lookup(['unknown'], default=0.0)[0] == 0.0
+    # One date for every product, today by default
+    np.testing.assert_allclose(prices.lookup(['p1', 'p2']), [3.0, 1.2])
+    np.testing.assert_allclose(prices.lookup(pd.Series(['p1', 'p2']), as_of=today - timedelta(days=15)),
+                               [2.5, 1.0])
+    assert prices.lookup([]).shape == (0,)
+
+def test_misses_are_loaded_together_and_writes_invalidate(prices, monkeypatch):
+    loads = []
+    load = prices._load
+    monkeypatch.setattr(prices, '_load', lambda product_ids: loads.append(product_ids) or load(product_ids))
+
+    prices.lookup(['p1', 'p2', 'p1'])
+    prices.lookup(['p1', 'p2', 'p3'])
+    assert loads == [['p1', 'p2'], ['p3']]
+
+    prices.write_prices(pd.DataFrame({'product_id': ['p2'], 'date': [date.today()], 'price': [1.5]}), 'test')
+    assert prices.lookup(['p1', 'p2'])[1] == 1.5
+    assert loads[-1] == ['p2']
+
+def test_price_feeds_are_read_from_files(prices, tmp_path):
+    feed = tmp_path / 'prices.csv'
+    feed.write_text(f"product_id,date,price\np3,{date.today().isoformat()},7.25\np1,,4.0\n")
+
+    assert prices.refresh_from_file(str(feed)) == 1
+    assert prices.lookup(['p3'])[0] == 7.25
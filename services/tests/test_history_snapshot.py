@@ -0,0 +1,72 @@
+"""
+History snapshot
+Exported tables read back memory-mapped, in the shapes the services query for
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_service import AnomalyDetectionService
+from services.shared.history_snapshot import HistorySnapshot
+from conftest import days_ago
+
+@pytest.fixture
+def with_waste(seeded):
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        seeded.bulk_insert(cursor, "INSERT INTO waste_logs (product_id, date, quantity, cost, reason) VALUES %s", [
+            ('p1', days_ago(1), 2, 4.0, 'spoilage'),
+            ('p1', days_ago(1), 1, 2.0, 'spoilage'),
+            ('p1', days_ago(1), 3, 6.0, 'expired'),
+            ('p2', days_ago(3), 5, 5.0, None),
+            ('p2', days_ago(60), 9, 9.0, 'expired')
+        ])
+    conn.commit()
+    conn.close()
+    return seeded
+
+@pytest.fixture
+def snapshot(with_waste, tmp_path):
+    return HistorySnapshot.export(with_waste, str(tmp_path), days=365)
+
+def rows(frame):
+    return sorted(tuple(None if pd.isna(value) else value for value in row)
+                  for row in frame.astype(object).itertuples(index=False))
+
+def test_export_writes_every_table(snapshot):
+    counts = snapshot.manifest['row_counts']
+
+    assert counts['sales'] == 3 and counts['waste_logs'] == 5 and counts['products'] == 3
+    assert snapshot.is_fresh()
+    # Dictionary-encoded IDs read back as categoricals
+    assert isinstance(snapshot.frame('sales')['recipe_id'].dtype, pd.CategoricalDtype)
+
+def test_numeric_columns_are_views_of_the_mapped_file(snapshot):
+    column = snapshot.table('inventory_history').column('quantity').chunk(0)
+    mapped = np.frombuffer(column.buffers()[1], dtype=column.type.to_pandas_dtype())
+
+    assert np.shares_memory(snapshot.frame('inventory_history')['quantity'].to_numpy(), mapped)
+
+def test_waste_is_read_from_the_snapshot(with_waste, snapshot):
+    raw = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=with_waste,
+                                  use_rollups=False)
+    service = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=with_waste,
+                                      snapshot=snapshot)
+
+    assert rows(service.get_waste_data(days=30)) == rows(raw.get_waste_data(days=30))
+
+    totals, reasons = service.get_waste_analytics(days=30)
+    raw_totals, raw_reasons = raw.get_waste_analytics(days=30)
+    assert rows(totals) == rows(raw_totals) and rows(reasons) == rows(raw_reasons)
+    assert totals.set_index('product_id').loc['p1', 'total_waste'] == 6
+
+def test_sales_shapes_match_the_database_queries(with_waste, snapshot):
+    raw = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=with_waste,
+                                  use_rollups=False)
+
+    assert rows(snapshot.daily_recipe_sales(days=30)) == rows(raw.get_sales_data(days=30))
+
+    # Whole days plus the complete hours of the snapshot's day
+    hourly = snapshot.recipe_hourly_sales(days=30)
+    assert hourly['y'].sum() == 7 and (hourly['ds'] < pd.Timestamp(snapshot.created_at).floor('h')).all()
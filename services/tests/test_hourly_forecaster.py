@@ -0,0 +1,65 @@
+"""
+Hourly demand forecaster
+Daily and weekly cycles, and a horizon anchored at the first hour without sales data
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hourly_forecaster import HourlyConfig, HourlyForecaster
+from services.shared.storage import translate_sqlite
+
+START = pd.Timestamp('2026-03-02')  # A Monday
+
+def lunch_sales(recipe_id, days, quantity=4.0, start=START):
+    """`quantity` sold at 12:00 and a quarter of it at 19:00, every day"""
+    ds = [start + pd.Timedelta(days=day, hours=hour) for day in range(days) for hour in (12, 19)]
+    y = [quantity if hour == 12 else quantity / 4 for _ in range(days) for hour in (12, 19)]
+    return pd.DataFrame({'recipe_id': recipe_id, 'ds': ds, 'y': y})
+
+def forecaster(**overrides):
+    return HourlyForecaster(HourlyConfig(history_days=28, horizon_hours=48, **overrides))
+
+def test_intraday_profile_is_forecast_per_series():
+    sales = pd.concat([lunch_sales('r1', 28), lunch_sales('r2', 28, quantity=40.0)])
+    forecast = forecaster().forecast(sales, ['r1', 'r2', 'r3'], START)
+
+    assert forecast['hours'][0] == START + pd.Timedelta(days=28)
+    predicted = pd.DataFrame(forecast['predicted'].T, index=forecast['hours'], columns=['r1', 'r2', 'r3'])
+    noon, evening = predicted.index.hour == 12, predicted.index.hour == 19
+
+    assert predicted.loc[noon, 'r1'].to_numpy() == pytest.approx(4.0, rel=0.15)
+    assert predicted.loc[noon, 'r2'].to_numpy() == pytest.approx(40.0, rel=0.15)
+    assert predicted.loc[evening, 'r1'].max() < predicted.loc[noon, 'r1'].min()
+    # A series with no sales forecasts nothing
+    assert predicted['r3'].sum() == 0
+    assert (forecast['lower'] <= forecast['predicted']).all() and (forecast['predicted'] <= forecast['upper']).all()
+
+def test_horizon_starts_at_the_anchor_hour():
+    anchor = START + pd.Timedelta(days=28, hours=15, minutes=40)
+    forecast = forecaster().forecast(lunch_sales('r1', 28), ['r1'], START, anchor)
+
+    assert forecast['hours'][0] == anchor.floor('h') and len(forecast['hours']) == 48
+    # The next forecast lunch is tomorrow's; today's has already happened
+    first_noon = np.flatnonzero(forecast['hours'].hour == 12)[0]
+    assert forecast['hours'][first_noon].day == anchor.day + 1
+
+def test_todays_complete_hours_move_the_level():
+    history = lunch_sales('r1', 28)
+    anchor = START + pd.Timedelta(days=28, hours=14)
+    busy_lunch = pd.DataFrame({'recipe_id': ['r1'], 'ds': [START + pd.Timedelta(days=28, hours=12)], 'y': [12.0]})
+
+    usual = forecaster().forecast(history, ['r1'], START, anchor)['predicted']
+    busy = forecaster().forecast(pd.concat([history, busy_lunch]), ['r1'], START, anchor)['predicted']
+
+    assert (busy > usual).any() and (busy >= usual).all()
+
+def test_anchor_must_follow_the_history_window():
+    with pytest.raises(ValueError):
+        forecaster().forecast(lunch_sales('r1', 28), ['r1'], START, START + pd.Timedelta(days=30))
+
+def test_hourly_sales_query_ends_at_the_current_hour():
+    query, _ = translate_sqlite("SELECT * FROM sales WHERE s.date < DATE_TRUNC('hour', NOW())", [])
+
+    assert "s.date < strftime('%Y-%m-%d %H:00:00', datetime('now', 'localtime'))" in query
@@ -0,0 +1,99 @@
+"""
+Job leases
+One holder per job, per-window completion, renewal, fencing and Redis outages
+"""
+
+import asyncio
+import time
+
+import pytest
+import redis
+
+from services.shared.job_lease import JobLease, LeaseLost, run_exclusive
+
+class UnreachableRedis:
+    """Client whose every script call fails as if the server were down"""
+
+    def register_script(self, script):
+        def call(keys=None, args=None):
+            raise redis.ConnectionError("Connection refused")
+        return call
+
+def test_one_holder_per_job(redis_client):
+    first, second = JobLease(redis_client, 'nightly'), JobLease(redis_client, 'nightly')
+
+    assert first.acquire()
+    assert not second.acquire() and second.skip_status == 'running'
+
+    # A successful run marks the window done; an unfinished one lets the next holder in
+    first.release(completed=True)
+    third = JobLease(redis_client, 'nightly')
+    assert not third.acquire() and third.skip_status == 'completed'
+
+    retry = JobLease(redis_client, 'hourly')
+    assert retry.acquire()
+    retry.release(completed=False)
+    successor = JobLease(redis_client, 'hourly')
+    assert successor.acquire() and successor.token == retry.token + 1
+
+def test_renewal_keeps_the_lease_past_its_ttl(redis_client):
+    lease = JobLease(redis_client, 'nightly', ttl_seconds=0.3)
+    assert lease.acquire()
+    lease.start_renewal()
+
+    time.sleep(0.7)
+    lease.check()
+    assert redis_client.get(lease.lease_key).decode() == lease.value
+
+    lease.release(completed=False)
+    assert redis_client.get(lease.lease_key) is None
+
+def test_renewal_notices_a_lease_taken_over(redis_client):
+    lease = JobLease(redis_client, 'nightly', ttl_seconds=0.3)
+    assert lease.acquire()
+    lease.start_renewal()
+
+    # The lease expired while this holder was paused and another replica took it
+    redis_client.set(lease.lease_key, 'other#99')
+    time.sleep(0.3)
+
+    with pytest.raises(LeaseLost):
+        lease.check()
+    lease.release(completed=True)
+    assert redis_client.get(lease.lease_key) == b'other#99'
+    assert redis_client.get(lease.done_key) is None
+
+def test_fence_refuses_a_superseded_holder(redis_client, storage):
+    stale = JobLease(redis_client, 'nightly', ttl_seconds=60)
+    assert stale.acquire()
+    redis_client.delete(stale.lease_key)
+    successor = JobLease(redis_client, 'nightly', ttl_seconds=60)
+    assert successor.acquire()
+
+    conn = storage.connect()
+    with conn.cursor() as cursor:
+        successor.fence(cursor)
+    conn.commit()
+
+    with conn.cursor() as cursor:
+        with pytest.raises(LeaseLost):
+            stale.fence(cursor)
+    conn.rollback()
+    conn.close()
+
+    assert stale.lost
+
+def test_redis_outage_skips_unless_fail_open():
+    lease = JobLease(UnreachableRedis(), 'nightly')
+    assert not lease.acquire() and lease.skip_status == 'unavailable'
+
+    lease = JobLease(UnreachableRedis(), 'forecasts', fail_open=True)
+    assert lease.acquire() and lease.token is None
+
+def test_run_exclusive_reports_skips(redis_client):
+    async def job(lease):
+        return {'ran': lease.token}
+
+    assert asyncio.run(run_exclusive(JobLease(redis_client, 'nightly'), job)) == {'ran': 1}
+    assert asyncio.run(run_exclusive(JobLease(redis_client, 'nightly'), job))['status'] == 'completed'
+    assert asyncio.run(run_exclusive(JobLease(UnreachableRedis(), 'nightly'), job))['status'] == 'unavailable'
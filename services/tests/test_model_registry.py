@@ -0,0 +1,81 @@
+"""
+Model registry and model reuse
+Stored models are refit only when missing, too old or drifting, and scored out of sample
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('prophet')
+
+from model_registry import ModelRegistry, RetrainPolicy, StoredModel, weighted_error
+from forecasting_service import ForecastingService
+
+def daily(values, start='2026-01-01'):
+    return pd.DataFrame({'ds': pd.date_range(start, periods=len(values), freq='D'), 'y': values})
+
+@pytest.fixture
+def service(storage, tmp_path):
+    return ForecastingService('sqlite:///:memory:', 'redis://localhost:6379', storage=storage,
+                              model_dir=str(tmp_path / 'models'))
+
+def test_weighted_error():
+    assert weighted_error(np.array([10.0, 10.0]), np.array([12.0, 7.0])) == pytest.approx(0.25)
+    assert weighted_error(np.zeros(3), np.zeros(3)) == 0.0
+    assert weighted_error(np.zeros(3), np.ones(3)) == float('inf')
+
+def test_noisy_series_get_a_wider_drift_threshold():
+    policy = RetrainPolicy(max_error=0.3, drift_ratio=1.5)
+
+    assert policy.error_threshold(0.1) == 0.3
+    assert policy.error_threshold(0.4) == pytest.approx(0.6)
+
+def test_metadata_is_rewritten_without_the_model(service, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    stored = StoredModel(model=service.train_prophet_model(daily(1 + np.arange(30.0)), 'sales_r1'),
+                         series_class='sales', fitted_at=datetime(2026, 3, 1),
+                         trained_through=pd.Timestamp('2026-01-30'), fit_error=0.1)
+    registry.put('sales/r1', stored, refit=True)
+    model_file = os.path.join(str(tmp_path), 'sales_r1.model.json')
+    written = os.path.getmtime(model_file)
+
+    stored.error, stored.bias = 0.2, 1.5
+    os.utime(model_file, (written - 60, written - 60))
+    registry.put('sales/r1', stored, refit=False)
+    assert os.path.getmtime(model_file) == written - 60
+
+    reloaded = ModelRegistry(str(tmp_path)).get('sales/r1')
+    assert (reloaded.error, reloaded.bias, reloaded.trained_through) == (0.2, 1.5, pd.Timestamp('2026-01-30'))
+
+def test_stored_models_are_reused_and_scored_after_their_cutoff(service):
+    history = daily(20 + np.arange(60.0))
+
+    first = service.get_model('sales', 'sales_r1', history)
+    assert service.model_counts['refit_new'] == 1
+    # Fitted on every day there is: nothing out of sample yet
+    assert first.trained_through == history['ds'].max() and first.error is None
+    assert service.calculate_forecast_accuracy(first) == 0.85
+
+    # Five new days on the same trend: reused, and scored on those days only
+    history = daily(20 + np.arange(65.0))
+    second = service.get_model('sales', 'sales_r1', history)
+    assert service.model_counts['reused'] == 1 and second.trained_through == first.trained_through
+    assert second.error is not None
+    assert service.calculate_forecast_accuracy(second) == pytest.approx(1 - second.error)
+
+def test_drift_and_age_trigger_refits(service):
+    service.get_model('sales', 'sales_r1', daily(20 + np.arange(60.0)))
+
+    # The level doubles after the cutoff
+    drifted = daily(np.concatenate([20 + np.arange(60.0), np.full(5, 200.0)]))
+    refit = service.get_model('sales', 'sales_r1', drifted)
+    assert service.model_counts['refit_drift'] == 1
+    assert refit.trained_through == drifted['ds'].max() and refit.error is None
+
+    refit.fitted_at = datetime.now() - timedelta(days=30)
+    service.get_model('sales', 'sales_r1', drifted)
+    assert service.model_counts['refit_age'] == 1
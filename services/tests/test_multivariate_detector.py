@@ -0,0 +1,68 @@
+"""
+Multivariate anomaly detector
+Daily product features and IsolationForest scoring against a fixed isolation score cutoff
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from multivariate_detector import FEATURE_COLUMNS, MultivariateAnomalyDetector
+
+def ordinary_days(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(loc=[20, 200, 10, 2, 1.0], scale=[2, 20, 1, 0.5, 0.05], size=(n, len(FEATURE_COLUMNS)))
+    return pd.DataFrame(values, columns=FEATURE_COLUMNS).assign(product_id='p1', date=date(2026, 3, 2))
+
+@pytest.fixture
+def detector(tmp_path):
+    detector = MultivariateAnomalyDetector(str(tmp_path / 'isolation_forest.joblib'), n_jobs=1)
+    assert detector.train(ordinary_days(1000))
+    return detector
+
+def test_features_share_the_product_day_key():
+    day = date(2026, 3, 2)
+    features = MultivariateAnomalyDetector.build_features(
+        pd.DataFrame({'date': [day], 'recipe_id': ['r1'], 'total_quantity': [10], 'total_revenue': [120.0],
+                      'transaction_count': [4]}),
+        pd.DataFrame({'product_id': ['p1', 'p1', 'p2'], 'date': [day] * 3,
+                      'change_type': ['consumption', 'restock', 'consumption'], 'change_amount': [-6.0, 10.0, -3.0]}),
+        pd.DataFrame({'product_id': ['p1'], 'date': [day], 'total_waste': [1.5]}),
+        pd.DataFrame({'recipe_id': ['r1'], 'product_id': ['p1'], 'ingredient_quantity': [0.5]})
+    ).set_index('product_id')
+
+    assert features.loc['p1', FEATURE_COLUMNS].tolist() == [5.0, 120.0, 4.0, 1.5, pytest.approx(1.2)]
+    # Consumed without any expected usage: the ratio stays neutral
+    assert features.loc['p2', 'consumption_ratio'] == 1.0
+
+def test_ordinary_days_are_not_flagged_at_a_fixed_rate(detector):
+    scored = detector.score(ordinary_days(500, seed=1))
+
+    # A contamination rate would flag about 5% of any batch, however ordinary
+    assert scored['is_anomaly'].mean() < 0.01
+    assert scored['anomaly_score'].between(0, 1).all()
+
+def test_unusual_days_are_flagged_and_explained(detector):
+    unusual = pd.DataFrame([[60, 600, 30, 10, 3.0]], columns=FEATURE_COLUMNS).assign(product_id='p1', date=date(2026, 3, 3))
+    scored = detector.score(pd.concat([ordinary_days(3, seed=2), unusual], ignore_index=True))
+
+    assert scored['is_anomaly'].tolist() == [False, False, False, True]
+    assert scored['top_feature'].iloc[-1] == 'consumption_ratio' and scored['top_z'].iloc[-1] > 10
+
+    # The cutoff comes from configuration
+    assert detector.score(ordinary_days(3, seed=2), score_threshold=0.0)['is_anomaly'].all()
+
+def test_model_is_persisted(detector):
+    reloaded = MultivariateAnomalyDetector(detector.model_path)
+
+    assert reloaded.load() and not reloaded.is_stale()
+    np.testing.assert_allclose(reloaded.score(ordinary_days(5))['anomaly_score'],
+                               detector.score(ordinary_days(5))['anomaly_score'])
+
+def test_too_little_history_is_not_trained(tmp_path):
+    detector = MultivariateAnomalyDetector(str(tmp_path / 'model.joblib'))
+
+    assert not detector.train(ordinary_days(10))
+    assert detector.model is None and not detector.score(ordinary_days(3))['is_anomaly'].any()
@@ -0,0 +1,103 @@
+"""
+Order consolidation optimizer
+Supplier choice, price breaks, minimum order values and zero-quantity demand
+"""
+
+import pandas as pd
+import pytest
+
+from services.restocking.order_optimizer import OrderOptimizer, OptimizerConfig, PLAN_COLUMNS
+
+def demand(*lines):
+    return pd.DataFrame(lines, columns=['product_id', 'product_name', 'quantity', 'max_lead_time'])
+
+def offers(*lines):
+    return pd.DataFrame(lines, columns=[
+        'product_id', 'supplier_id', 'supplier_name', 'lead_time', 'minimum_order', 'min_quantity', 'unit_price'
+    ])
+
+def by_product(plan):
+    return plan.set_index('product_id')
+
+def test_cheapest_supplier_wins():
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Tomatoes', 10, 5)),
+        offers(('p1', 's1', 'A', 2, 0, 0, 2.0), ('p1', 's2', 'B', 2, 0, 0, 1.5))
+    )
+
+    assert list(plan.columns) == PLAN_COLUMNS
+    assert by_product(plan).loc['p1', 'supplier_id'] == 's2'
+    assert plan['line_cost'].sum() == pytest.approx(15.0)
+
+def test_price_break_bumps_the_quantity_when_cheaper():
+    # 40 at 2.0 costs 80; the 50-unit break at 1.5 costs 75
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Flour', 40, 5)),
+        offers(('p1', 's1', 'A', 2, 0, 0, 2.0), ('p1', 's1', 'A', 2, 0, 50, 1.5))
+    )
+
+    line = by_product(plan).loc['p1']
+    assert line['order_quantity'] == 50 and line['line_cost'] == pytest.approx(75.0)
+
+def test_late_suppliers_only_as_fallback():
+    options = offers(('p1', 's1', 'Slow', 10, 0, 0, 1.0), ('p1', 's2', 'Fast', 2, 0, 0, 3.0))
+
+    plan = OrderOptimizer().optimize(demand(('p1', 'Basil', 5, 3)), options)
+    assert by_product(plan).loc['p1', 'supplier_id'] == 's2'
+
+    # Nobody delivers within a day: the fastest supplier is used and flagged late
+    plan = OrderOptimizer().optimize(demand(('p1', 'Basil', 5, 1)), options)
+    assert by_product(plan).loc['p1', ['supplier_id', 'late']].tolist() == ['s2', True]
+
+    plan = OrderOptimizer(OptimizerConfig(allow_late_suppliers=False)).optimize(demand(('p1', 'Basil', 5, 1)), options)
+    assert plan.empty
+
+def test_minimum_order_is_an_order_value():
+    # s1 needs 100 in value per order; 10 units at 2.0 is only 20, so the order is padded
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Tomatoes', 10, 5)),
+        offers(('p1', 's1', 'A', 2, 100.0, 0, 2.0))
+    )
+
+    line = by_product(plan).loc['p1']
+    assert line['padded_to_minimum']
+    assert line['line_cost'] == pytest.approx(100.0) and line['order_quantity'] == pytest.approx(50.0)
+
+def test_small_orders_move_to_an_open_supplier_when_cheaper_than_padding():
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Tomatoes', 10, 5), ('p2', 'Flour', 100, 5)),
+        offers(
+            ('p1', 's1', 'Specialist', 2, 100.0, 0, 1.8),
+            ('p1', 's2', 'Wholesale', 2, 50.0, 0, 2.0),
+            ('p2', 's2', 'Wholesale', 2, 50.0, 0, 1.0)
+        )
+    )
+
+    # Padding s1 to 100 would cost 82 more; moving p1 to s2 costs 2 more
+    assert set(plan['supplier_id']) == {'s2'}
+    assert not plan['padded_to_minimum'].any()
+    assert plan['line_cost'].sum() == pytest.approx(120.0)
+
+def test_zero_quantity_demand_is_ignored():
+    options = offers(('p1', 's1', 'A', 2, 0, 10, 2.0), ('p2', 's2', 'B', 2, 0, 0, 1.0), ('p3', 's2', 'B', 2, 0, 0, 1.0))
+
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Tomatoes', 0, 5), ('p2', 'Flour', -3, 5), ('p3', 'Salt', 4, 5)), options
+    )
+    assert plan['product_id'].tolist() == ['p3']
+
+    # Nothing to order: no lines at all, not empty lines bumped to a price break
+    plan = OrderOptimizer().optimize(demand(('p1', 'Tomatoes', 0, 5)), options)
+    assert plan.empty and list(plan.columns) == PLAN_COLUMNS
+
+def test_padded_quantities_are_repriced_at_the_break_they_reach():
+    # Padding 10 units at 2.0 to a value of 100 reaches the 40-unit break at 1.6;
+    # at that price 50 units are only worth 80, so the order is padded again
+    plan = OrderOptimizer().optimize(
+        demand(('p1', 'Tomatoes', 10, 5)),
+        offers(('p1', 's1', 'A', 2, 100.0, 0, 2.0), ('p1', 's1', 'A', 2, 100.0, 40, 1.6))
+    )
+
+    line = by_product(plan).loc['p1']
+    assert line['padded_to_minimum'] and line['unit_price'] == pytest.approx(1.6)
+    assert line['order_quantity'] == pytest.approx(62.5) and line['line_cost'] == pytest.approx(100.0)
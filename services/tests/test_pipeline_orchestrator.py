@@ -0,0 +1,89 @@
+"""
+Pipeline orchestrator
+Stages run as a dependency graph: dependents wait, failures skip only what depends on them
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('prophet')
+
+from services.orchestrator.pipeline_orchestrator import PipelineOrchestrator, PipelineStage, StageSkipped
+
+@pytest.fixture
+def orchestrator(seeded):
+    return PipelineOrchestrator('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+
+def stage(name, seconds=0.1, error=None, **edges):
+    async def run():
+        await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+        return name
+    return PipelineStage(name, run, **edges)
+
+def test_independent_stages_overlap_and_dependents_wait(orchestrator):
+    report = asyncio.run(orchestrator.run([
+        stage('forecasting', 0.3),
+        stage('restocking', depends_on=['forecasting']),
+        stage('anomaly_detection', 0.3)
+    ]))
+    stages = report['stages']
+
+    assert report['status'] == 'ok' and {s['status'] for s in stages.values()} == {'ok'}
+    assert stages['restocking']['result'] == 'restocking'
+    assert stages['anomaly_detection']['started'] < stages['forecasting']['seconds']
+    assert stages['restocking']['started'] >= stages['forecasting']['seconds']
+    assert report['seconds'] < 0.55
+
+def test_failures_skip_dependents_but_not_ordered_stages(orchestrator):
+    report = asyncio.run(orchestrator.run([
+        stage('snapshot', error=OSError("disk full")),
+        stage('forecasting', error=RuntimeError("Forecasts were not generated and saved"), after=['snapshot']),
+        stage('restocking', depends_on=['forecasting']),
+        stage('anomaly_detection', after=['snapshot'])
+    ]))
+    statuses = {name: (s['status'], s['error']) for name, s in report['stages'].items()}
+
+    assert report['status'] == 'failed'
+    assert statuses['snapshot'] == ('failed', "disk full")
+    assert statuses['forecasting'][0] == 'failed'
+    assert statuses['restocking'] == ('skipped', "dependencies did not succeed: ['forecasting']")
+    assert statuses['anomaly_detection'] == ('ok', None)
+
+def test_stages_running_elsewhere_do_not_fail_the_pipeline(orchestrator):
+    report = asyncio.run(orchestrator.run([
+        stage('forecasting', error=StageSkipped("Forecasting is running on another replica")),
+        stage('restocking', depends_on=['forecasting'])
+    ]))
+
+    assert report['status'] == 'ok'
+    assert [s['status'] for s in report['stages'].values()] == ['skipped', 'skipped']
+
+def test_graph_is_validated_before_anything_runs(orchestrator):
+    # Ordering edges to an absent snapshot stage are dropped
+    assert asyncio.run(orchestrator.run([stage('forecasting', after=['snapshot'])]))['status'] == 'ok'
+
+    with pytest.raises(ValueError, match="unknown"):
+        asyncio.run(orchestrator.run([stage('restocking', depends_on=['forecasting'])]))
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(orchestrator.run([stage('a', depends_on=['b']), stage('b', after=['a'])]))
+
+def test_lease_reports_decide_whether_a_stage_ran():
+    assert not PipelineOrchestrator._lease_skipped('Forecasting', {'forecasts': 3, 'saved': True})
+    assert PipelineOrchestrator._lease_skipped('Forecasting', {'skipped': 'done', 'status': 'completed'})
+
+    with pytest.raises(StageSkipped):
+        PipelineOrchestrator._lease_skipped('Forecasting', {'skipped': 'held', 'status': 'running'})
+    with pytest.raises(RuntimeError):
+        PipelineOrchestrator._lease_skipped('Forecasting', {'skipped': 'redis down', 'status': 'unavailable'})
+
+def test_snapshot_stage_only_when_configured(orchestrator, tmp_path):
+    assert [s.name for s in orchestrator.build_stages()] == ['forecasting', 'restocking', 'anomaly_detection']
+
+    orchestrator.snapshot_dir = str(tmp_path)
+    assert orchestrator.build_stages()[0].name == 'snapshot'
+    counts = asyncio.run(orchestrator.export_snapshot())
+    assert counts['sales'] == 3
+    assert orchestrator.forecasting.snapshot is orchestrator.restocking.snapshot is orchestrator.anomaly.snapshot
@@ -0,0 +1,56 @@
+"""
+Columnar record batches
+Forecast records round-trip through NumPy columns and back to records and insert rows
+"""
+
+import numpy as np
+import pytest
+
+from lib.types import InventoryForecast, InventoryForecastBatch, RecordBatch, SalesForecast, SalesForecastBatch
+
+def sales_forecast(day, quantity):
+    return SalesForecast(
+        id=f"sf-{day}", recipeId='r1', recipeName='Margherita', date=f"2026-03-{day:02d}",
+        predictedQuantity=quantity, confidenceInterval={'lower': quantity - 2, 'upper': quantity + 2},
+        modelType='prophet', accuracy=0.9, createdAt='2026-03-01T00:00:00', updatedAt='2026-03-01T00:00:00'
+    )
+
+def inventory_forecast(day, depletion=None):
+    return InventoryForecast(
+        id=f"if-{day}", productId='p1', productName='Tomatoes', date=f"2026-03-{day:02d}",
+        predictedStock=40.0 - day, depletionDate=depletion, reorderDate=None, suggestedOrderQuantity=12.0,
+        confidenceLevel=0.8, modelType='prophet', createdAt='2026-03-01T00:00:00', updatedAt='2026-03-01T00:00:00'
+    )
+
+def test_sales_forecasts_round_trip():
+    records = [sales_forecast(day, 10.0 + day) for day in range(1, 4)]
+    batch = SalesForecastBatch.from_records(records[:2])
+    batch.extend(records[2:])
+
+    assert len(batch) == 3 and list(batch) == records
+    assert batch.columns['date'].dtype == np.dtype('datetime64[D]')
+    assert batch.rows(['id', 'confidenceLower'])[0] == ('sf-1', 9.0)
+
+def test_missing_dates_come_back_as_none():
+    records = [inventory_forecast(1, depletion='2026-03-09'), inventory_forecast(2)]
+    batch = InventoryForecastBatch.from_records(records)
+
+    assert list(batch) == records
+    assert batch.column_values('depletionDate') == ['2026-03-09', None]
+    assert batch.to_frame()['predictedStock'].tolist() == [39.0, 38.0]
+
+def test_columns_can_be_appended_in_chunks():
+    batch = InventoryForecastBatch()
+    assert len(batch) == 0 and batch.rows() == []
+
+    batch.append_columns(**{name: [value] for (name, _), value in
+                            zip(InventoryForecastBatch.COLUMNS, batch.flatten(inventory_forecast(5)))})
+    batch.extend([inventory_forecast(6)])
+    assert [record.id for record in batch] == ['if-5', 'if-6']
+
+def test_batches_must_define_their_record_mapping():
+    class Untyped(RecordBatch):
+        COLUMNS = (('id', 'str'),)
+
+    with pytest.raises(TypeError):
+        Untyped()
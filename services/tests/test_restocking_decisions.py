@@ -0,0 +1,164 @@
+"""
+Restocking decisions and purchase order generation
+Orders are sized from inventory position; nothing is ever ordered for zero units
+"""
+
+import asyncio
+
+import pandas as pd
+import pytest
+
+from services.restocking.safety_stock_simulator import order_quantity
+from restocking_service import AutoRestockingService, RestockingConfig, RestockingDecision, RestockingTrigger
+
+def config(product_id, safety_stock=10.0, reorder_point=20.0, lead_time=5, minimum_quantity=1.0):
+    return RestockingConfig(
+        productId=product_id, autoRestockEnabled=True, safetyStockLevel=safety_stock,
+        reorderPoint=reorder_point, leadTime=lead_time, minimumOrderQuantity=minimum_quantity,
+        supplierId='s1', updatedAt=''
+    )
+
+def forecasts(*products):
+    return pd.DataFrame([{
+        'product_id': product_id, 'product_name': product_id.upper(), 'date': '2026-01-01',
+        'predicted_stock': predicted, 'depletion_date': None, 'reorder_date': None, 'confidence_level': 0.9
+    } for product_id, predicted in products])
+
+@pytest.fixture
+def service(storage):
+    return AutoRestockingService('sqlite:///:memory:', 'redis://localhost:6379', storage=storage)
+
+def test_order_quantity_tops_up_the_position():
+    assert order_quantity(4.0, 10.0, 5) == pytest.approx(6.5)
+    assert order_quantity(4.0, 10.0, 5, order_up_to=30.0) == pytest.approx(26.0)
+    assert order_quantity(40.0, 10.0, 5) == 0.0
+
+def test_orders_are_sized_from_inventory_position(service):
+    decisions = service.calculate_restocking_decisions(
+        forecasts(('a', 5.0)), {'a': config('a')}, current_inventory={'a': 2.0}, on_order={'a': 3.0}
+    )
+
+    assert [(d.decision, d.trigger_reason) for d in decisions] == [('order', RestockingTrigger.SAFETY_STOCK)]
+    # Safety stock plus lead-time buffer (10.5) less on hand and on order (5)
+    assert decisions[0].suggested_order_quantity == pytest.approx(5.5)
+
+def test_simulated_order_up_to_level_sizes_every_trigger(service):
+    levels = pd.DataFrame([{'product_id': 'a', 'safety_stock': 10.0, 'reorder_point': 20.0, 'order_up_to_level': 40.0}])
+    decisions = service.calculate_restocking_decisions(
+        forecasts(('a', 50.0)), {'a': config('a')}, current_inventory={'a': 15.0}, simulated_levels=levels
+    )
+
+    assert decisions[0].trigger_reason == RestockingTrigger.LOW_STOCK
+    assert decisions[0].suggested_order_quantity == pytest.approx(25.0)
+
+def test_no_decision_when_the_position_already_covers_the_target(service):
+    # 'a' trips the safety stock trigger but stock on order covers it; 'b' is at its
+    # reorder point but already above safety stock plus buffer
+    decisions = service.calculate_restocking_decisions(
+        forecasts(('a', 5.0), ('b', 50.0)), {'a': config('a'), 'b': config('b')},
+        current_inventory={'a': 2.0, 'b': 15.0}, on_order={'a': 100.0}
+    )
+
+    assert decisions == []
+
+def test_zero_quantity_decisions_produce_no_purchase_orders(service, seeded):
+    def decision(product_id, quantity):
+        return RestockingDecision(
+            product_id=product_id, product_name=product_id, decision='order',
+            trigger_reason=RestockingTrigger.LOW_STOCK, current_stock=0, forecasted_demand=0,
+            suggested_order_quantity=quantity, safety_stock_level=0, lead_time=7, confidence=1.0,
+            reasoning='', cost_estimate=0.0
+        )
+
+    assert asyncio.run(service.generate_purchase_orders([decision('p1', 0), decision('p2', 0)])) == []
+
+    orders = asyncio.run(service.generate_purchase_orders([decision('p1', 0), decision('p2', 30)]))
+    assert [(po.supplierId, [item.productId for item in po.items]) for po in orders] == [('s2', ['p2'])]
+    assert orders[0].totalAmount == pytest.approx(30.0)
+
+def test_purchase_order_ids_are_unique_within_a_second(service, seeded):
+    decision = RestockingDecision(
+        product_id='p2', product_name='Flour', decision='order', trigger_reason=RestockingTrigger.LOW_STOCK,
+        current_stock=0, forecasted_demand=0, suggested_order_quantity=30, safety_stock_level=0, lead_time=7,
+        confidence=1.0, reasoning='', cost_estimate=0.0
+    )
+
+    first, second = (asyncio.run(service.generate_purchase_orders([decision]))[0] for _ in range(2))
+    assert first.id != second.id and first.items[0].id != second.items[0].id
+
+def test_only_the_lease_holder_consumes_inventory_changes(seeded, redis_client):
+    from restocking_service import INVENTORY_CHANGES_STREAM
+
+    leader, follower = (
+        AutoRestockingService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded) for _ in range(2)
+    )
+    batches = {id(leader): [], id(follower): []}
+    for replica in (leader, follower):
+        replica.redis_client = redis_client
+
+        async def record(product_ids=None, lease=None, replica=replica):
+            batches[id(replica)].append((product_ids, lease.token))
+            return {'decisions': 0, 'purchase_orders': 0}
+
+        replica.run_auto_restocking = record
+
+    async def run():
+        consumers = [asyncio.create_task(replica.run_event_driven_restocking(
+            source='redis', debounce_seconds=0.05, lease_ttl_seconds=5.0
+        )) for replica in (leader, follower)]
+        await asyncio.sleep(0.2)
+        for product_id in ['p1', 'p2', 'p1']:
+            redis_client.xadd(INVENTORY_CHANGES_STREAM, {'product_id': product_id})
+        await asyncio.sleep(0.5)
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+    asyncio.run(run())
+
+    # One replica saw the batch once, under its fencing token, and acknowledged it
+    processed = [batch for replica_batches in batches.values() for batch in replica_batches]
+    assert processed == [(['p1', 'p2'], 1)]
+    assert redis_client.xpending(INVENTORY_CHANGES_STREAM, 'auto_restocking')['pending'] == 0
+
+def test_batch_approval_hydrates_and_dispatches_pending_orders(service, seeded):
+    def decision(product_id, quantity):
+        return RestockingDecision(
+            product_id=product_id, product_name=product_id, decision='order',
+            trigger_reason=RestockingTrigger.LOW_STOCK, current_stock=0, forecasted_demand=0,
+            suggested_order_quantity=quantity, safety_stock_level=0, lead_time=7, confidence=1.0,
+            reasoning='', cost_estimate=0.0
+        )
+
+    orders = [asyncio.run(service.generate_purchase_orders([decision(product_id, quantity)]))[0]
+              for product_id, quantity in [('p3', 20), ('p2', 30), ('p2', 10)]]
+    assert len(asyncio.run(service.save_purchase_orders(orders))) == 3
+    approved_id, pending_ids = orders[0].id, [orders[1].id, orders[2].id]
+    dispatched = []
+
+    async def send(purchase_order):
+        if purchase_order.id == pending_ids[1]:
+            raise ConnectionError("supplier API down")
+        dispatched.append((purchase_order.id, purchase_order.status, len(purchase_order.items)))
+        return True
+
+    service.send_to_supplier_api = send
+    asyncio.run(service.approve_purchase_orders([approved_id], 'chef'))
+    dispatched.clear()
+
+    results = asyncio.run(service.approve_purchase_orders(
+        pending_ids + [pending_ids[0], approved_id, 'missing'], 'manager'
+    ))
+
+    # Duplicates collapse; orders already approved or unknown are reported, not approved again
+    assert [(r.order_id, r.approved, r.dispatched) for r in results] == [
+        (pending_ids[0], True, True), (pending_ids[1], True, False),
+        (approved_id, False, False), ('missing', False, False)
+    ]
+    assert 'dispatch failed' in results[1].message and 'not pending' in results[3].message
+    # Hydrated from the same statement that approved them, items included
+    assert dispatched == [(pending_ids[0], 'approved', 1)]
+
+    approved = asyncio.run(service.get_purchase_order(pending_ids[1]))
+    assert (approved.status, approved.approvedBy) == ('approved', 'manager')
+    assert asyncio.run(service.approve_purchase_orders([], 'manager')) == []
@@ -0,0 +1,91 @@
+"""
+Serving API
+Cached, paginated reads answered with ETags and conditional 304 responses
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('prophet')
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from services.serving.serving_service import ResponseCache, ServingAPI, etag_matches
+
+@pytest.fixture
+def api(seeded):
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        seeded.bulk_insert(cursor, """
+            INSERT INTO sales_forecasts (id, recipe_id, recipe_name, date, predicted_quantity, confidence_lower,
+                                         confidence_upper, model_type, accuracy, created_at, updated_at)
+            VALUES %s
+        """, [
+            (f"sf-{day}", 'r1', 'Margherita', date.today() + timedelta(days=day), 10.0 + day, 8.0, 12.0,
+             'prophet', 0.9, '2026-03-01T00:00:00', '2026-03-01T00:00:00')
+            for day in range(3)
+        ])
+    conn.commit()
+    conn.close()
+    return ServingAPI('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+
+def fetch(api, *requests):
+    """Issue (path, headers) requests in order against a test server; returns (status, etag, json) each"""
+    async def run():
+        async with TestClient(TestServer(api.create_app())) as client:
+            responses = []
+            for path, headers in requests:
+                response = await client.get(path, headers=headers)
+                body = await response.json() if response.status == 200 else None
+                responses.append((response.status, response.headers.get('ETag'), body))
+            return responses
+    return asyncio.run(run())
+
+def test_etags_are_compared_as_whole_tags():
+    etag = '"abc123"'
+
+    assert etag_matches('"abc123"', etag)
+    assert etag_matches('"zzz", W/"abc123"', etag)
+    assert etag_matches('*', etag)
+    # A substring of the tag, or the tag inside a longer one, is not a match
+    assert not etag_matches('"abc"', etag)
+    assert not etag_matches('"abc1234"', etag)
+    assert not etag_matches('', etag)
+
+def test_response_cache_expires_and_evicts():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set(('sales', ()), b'a', '"a"')
+    cache.set(('inventory', ()), b'b', '"b"')
+    cache.get(('sales', ()))
+    cache.set(('restocking', ()), b'c', '"c"')
+
+    # The least recently used entry went
+    assert cache.get(('inventory', ())) is None and cache.get(('sales', ())) == (b'a', '"a"')
+    cache.invalidate('sales')
+    assert cache.get(('sales', ())) is None
+
+    cache.ttl_seconds = -1
+    assert cache.get(('restocking', ())) is None
+
+def test_reads_are_paginated_and_conditional(api):
+    (status, etag, body), (repeat, _, _), (stale, _, _), (second_page, _, page) = fetch(
+        api,
+        ('/api/forecast/sales?limit=2', {}),
+        ('/api/forecast/sales?limit=2', {'If-None-Match': '"other", W/"x"'}),
+        ('/api/forecast/sales?limit=2', {}),
+        ('/api/forecast/sales?limit=2&offset=2', {})
+    )
+
+    assert status == 200 and etag.startswith('"')
+    assert [row['predictedQuantity'] for row in body['data']] == [10.0, 11.0]
+    assert body['pagination'] == {'limit': 2, 'offset': 0, 'nextOffset': 2}
+    assert (repeat, stale) == (200, 200)
+    assert [row['id'] for row in page['data']] == ['sf-2'] and page['pagination']['nextOffset'] is None
+    # Only the first read of each page went to the database
+    assert api.cache.misses == 2 and api.cache.hits == 2
+
+    (not_modified, same_etag, _), = fetch(api, ('/api/forecast/sales?limit=2', {'If-None-Match': f"W/{etag}"}))
+    assert not_modified == 304 and same_etag == etag
@@ -0,0 +1,170 @@
+"""
+SQLite translation of the services' Postgres SQL
+Runs the queries the services actually issue against SQLITE_SCHEMA
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.shared.storage import PostgresBackend, SQLiteBackend, storage_from_url, translate_sqlite
+from services.shared.commodity_prices import CommodityPriceService
+from services.shared.job_lease import JobLease, LeaseLost
+
+class NoRedis:
+    """Stands in for the Redis client where only the database side is exercised"""
+
+    def register_script(self, script):
+        return None
+
+def rows(storage, query, params=None):
+    conn = storage.connect()
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+        result = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return result
+
+# translate_sqlite
+
+def test_any_expands_into_an_in_list():
+    query, params = translate_sqlite("SELECT id FROM products WHERE id = ANY(%s) AND lead_time > %s", [['a', 'b', 'c'], 2])
+
+    assert "id IN (?, ?, ?) AND lead_time > ?" in query
+    assert params == ['a', 'b', 'c', 2]
+
+def test_date_arithmetic_is_rewritten():
+    query, params = translate_sqlite("""
+        SELECT * FROM sales
+        WHERE date >= NOW() - INTERVAL '%s days'
+        AND date >= NOW() - %s * INTERVAL '1 day'
+        AND date >= CURRENT_DATE - %s
+        AND date < NOW() - INTERVAL '1 day'
+    """, [30, 30, 30])
+
+    assert "INTERVAL" not in query and "CURRENT_DATE" not in query and "NOW()" not in query
+    assert query.count("datetime('now', 'localtime', '-' || ? || ' days')") == 2
+    assert "date('now', 'localtime', '-' || ? || ' days')" in query
+    assert "datetime('now', 'localtime', '-1 days')" in query
+    assert params == [30, 30, 30]
+
+def test_ordered_array_agg_becomes_first_by_and_last_by():
+    query, _ = translate_sqlite("""
+        SELECT (ARRAY_AGG(current_stock ORDER BY created_at))[1],
+               (ARRAY_AGG(current_stock ORDER BY created_at DESC))[1]
+        FROM inventory_history
+    """)
+
+    assert "FIRST_BY(current_stock, created_at)" in query
+    assert "LAST_BY(current_stock, created_at)" in query
+
+# Service queries against the schema
+
+def test_first_by_and_last_by_aggregate_by_ordering_key(seeded):
+    result = rows(seeded, """
+        SELECT (ARRAY_AGG(current_stock ORDER BY created_at))[1] as first_stock,
+               (ARRAY_AGG(current_stock ORDER BY created_at DESC))[1] as last_stock
+        FROM inventory_history
+        WHERE created_at >= NOW() - INTERVAL '7 days'
+    """)
+
+    assert result == [{'first_stock': 30, 'last_stock': 21}]
+
+def test_restocking_lookups_expand_product_lists(seeded):
+    from restocking_service import AutoRestockingService
+
+    service = AutoRestockingService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+    conn = seeded.connect()
+    with conn.cursor() as cursor:
+        seeded.bulk_insert(cursor, "INSERT INTO purchase_orders (id, supplier_id, status) VALUES %s", [
+            ('po1', 's1', 'pending'), ('po2', 's1', 'received'), ('po3', 's2', 'ordered')
+        ])
+        seeded.bulk_insert(cursor, "INSERT INTO purchase_order_items (id, purchase_order_id, product_id, quantity) VALUES %s", [
+            ('i1', 'po1', 'p1', 4), ('i2', 'po2', 'p1', 100), ('i3', 'po3', 'p1', 6), ('i4', 'po3', 'p2', 8)
+        ])
+    conn.commit()
+    conn.close()
+
+    assert asyncio.run(service.get_on_order(['p1', 'p3'])) == {'p1': 10.0}
+    assert set(asyncio.run(service.get_product_configs(['p1', 'p2']))) == {'p1', 'p2'}
+
+    offers = asyncio.run(service.get_supplier_offers(['p1']))
+    assert sorted(zip(offers['supplier_id'], offers['min_quantity'])) == [('s1', 0), ('s2', 0), ('s2', 50)]
+
+def test_consumption_history_uses_interval_and_first_by(seeded):
+    from restocking_service import AutoRestockingService
+
+    service = AutoRestockingService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+    consumption, initial_stock = asyncio.run(service.get_consumption_history(days=7))
+
+    assert consumption['consumed'].tolist() == [9]
+    # Stock before the day's first movement: 30 on hand after a delivery of 10
+    assert initial_stock == {'p1': 20}
+
+def test_anomaly_rollups_upsert_and_read_back(seeded):
+    from anomaly_service import AnomalyDetectionService
+
+    service = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded)
+    assert asyncio.run(service.ensure_rollup_tables())
+    # The second refresh re-aggregates the same days through ON CONFLICT DO UPDATE
+    assert asyncio.run(service.refresh_rollups())
+    assert asyncio.run(service.refresh_rollups())
+
+    sales = service.get_sales_data(days=30)
+    assert sales['total_quantity'].tolist() == [4, 3]
+
+    inventory = service.get_inventory_data(days=30)
+    closing = inventory.set_index('change_type')['current_stock']
+    assert closing['consumption'] == 21 and closing['restock'] == 30
+
+def test_anomaly_raw_sales_query_uses_interval(seeded):
+    from anomaly_service import AnomalyDetectionService
+
+    service = AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=seeded,
+                                      use_rollups=False)
+    sales = service.get_sales_data(days=30)
+
+    assert sales['total_quantity'].sum() == 7
+
+def test_price_history_window_keeps_the_price_in_effect(seeded):
+    service = CommodityPriceService(seeded, history_days=30)
+    today = date.today()
+    service.write_prices(pd.DataFrame({
+        'product_id': ['p1', 'p1', 'p1', 'p2'],
+        'date': [today - timedelta(days=400), today - timedelta(days=100), today - timedelta(days=5),
+                 today - timedelta(days=200)],
+        'price': [1.0, 2.25, 3.0, 4.0]
+    }), 'test')
+    # Rewriting a day goes through ON CONFLICT DO UPDATE
+    service.write_prices(pd.DataFrame({'product_id': ['p1'], 'date': [today - timedelta(days=5)], 'price': [3.5]}), 'test')
+
+    prices = service.lookup(['p1', 'p1', 'p2', 'p3'], as_of=[today, today - timedelta(days=10), today, today])
+
+    np.testing.assert_allclose(prices, [3.5, 2.25, 4.0, 8.0])
+    assert len(service.histories(['p1'])['p1'].days) == 2
+
+def test_fence_upsert_refuses_an_older_token(storage):
+    newer, older = JobLease(NoRedis(), 'nightly'), JobLease(NoRedis(), 'nightly')
+    newer.token, newer.renewed_at = 2, float('inf')
+    older.token, older.renewed_at = 1, float('inf')
+
+    conn = storage.connect()
+    with conn.cursor() as cursor:
+        newer.fence(cursor)
+        # Re-fencing with the same token is allowed (several saves per run)
+        newer.fence(cursor)
+        with pytest.raises(LeaseLost):
+            older.fence(cursor)
+    conn.commit()
+    conn.close()
+
+    assert rows(storage, "SELECT job_name, token FROM job_fences") == [{'job_name': 'nightly', 'token': 2}]
+
+def test_storage_from_url_selects_the_backend():
+    assert isinstance(storage_from_url('sqlite:///:memory:'), SQLiteBackend)
+    assert isinstance(storage_from_url('sqlite:///'), SQLiteBackend)
+    # Constructing the Postgres backend does not need the driver
+    assert isinstance(storage_from_url('postgresql://localhost/restaurant'), PostgresBackend)
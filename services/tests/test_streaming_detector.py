@@ -0,0 +1,32 @@
+"""
+Streaming anomaly detection
+POS events read from the stream by several replicas
+"""
+
+import asyncio
+
+from anomaly_service import AnomalyDetectionService, STREAMING_GROUP
+
+def test_replicas_score_each_event_once(storage, redis_client):
+    scored = []
+    replicas = [
+        AnomalyDetectionService('sqlite:///:memory:', 'redis://localhost:6379', storage=storage) for _ in range(2)
+    ]
+    for replica in replicas:
+        replica.redis_client = redis_client
+        replica.streaming_detector.process_event = lambda *event: scored.append(event) or []
+
+    async def run():
+        consumers = [asyncio.create_task(replica.run_streaming_detection(block_ms=100)) for replica in replicas]
+        await asyncio.sleep(0.2)
+        for quantity in [3, 4, 5]:
+            redis_client.xadd('pos_events', {'series_type': 'sales', 'item_id': 'r1', 'quantity': quantity})
+        await asyncio.sleep(0.5)
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert sorted(quantity for _, _, quantity, _ in scored) == [3.0, 4.0, 5.0]
+    assert redis_client.xpending('pos_events', STREAMING_GROUP)['pending'] == 0
@@ -0,0 +1,74 @@
+"""
+Synthetic dataset generator
+Seeded datasets whose inventory history is consistent with the sales that drive it
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.benchmarks.synthetic_data import SyntheticConfig, SyntheticDataGenerator
+from services.shared.storage import SQLiteBackend
+
+def generate(storage, **overrides):
+    config = SyntheticConfig(n_recipes=6, n_products=8, n_suppliers=3, days=40, chunk_days=15, **overrides)
+    return SyntheticDataGenerator(storage, config).generate()
+
+def table(storage, query):
+    conn = storage.connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return pd.DataFrame([dict(row) for row in cursor.fetchall()])
+    finally:
+        conn.close()
+
+def test_catalogue_size_is_split_between_recipes_and_products():
+    config = SyntheticConfig.for_series(101, days=7)
+
+    assert (config.n_recipes, config.n_products, config.days) == (50, 51, 7)
+    assert SyntheticConfig.for_series(1).n_products == 1
+
+def test_row_counts_match_the_tables(storage):
+    counts = generate(storage)
+
+    for name, count in counts.items():
+        assert table(storage, f"SELECT COUNT(*) AS n FROM {name}")['n'].iloc[0] == count, name
+    assert counts['recipes'] == 6 and counts['products'] == 8 and counts['sales'] > 0
+    assert counts['inventory_forecasts'] == 8 * SyntheticConfig().forecast_days
+
+def test_same_seed_same_dataset(storage):
+    generate(storage)
+    other = SQLiteBackend(':memory:')
+    generate(other)
+    different = SQLiteBackend(':memory:')
+    generate(different, seed=7)
+
+    query = "SELECT recipe_id, quantity, price FROM sales ORDER BY date, recipe_id"
+    pd.testing.assert_frame_equal(table(storage, query), table(other, query))
+    assert not table(storage, query).equals(table(different, query))
+
+def test_inventory_history_follows_stock_movements(storage):
+    generate(storage, waste_probability=0.2)
+
+    history = table(storage, """
+        SELECT product_id, created_at, current_stock, quantity FROM inventory_history ORDER BY product_id, created_at
+    """)
+    products = table(storage, "SELECT id, current_stock, quantity FROM products").set_index('id')
+
+    assert (history['current_stock'] >= -1e-9).all()
+    for product_id, movements in history.groupby('product_id'):
+        stock = movements['current_stock'].to_numpy()
+        # Every movement changes the stock by its quantity, and the catalogue holds the final level
+        np.testing.assert_allclose(np.diff(stock), movements['quantity'].to_numpy()[1:], atol=1e-6)
+        assert products.loc[product_id, 'current_stock'] == stock[-1] == products.loc[product_id, 'quantity']
+
+    # Consumption is the recipe sales pushed through the ingredient quantities
+    usage = table(storage, """
+        SELECT ri.product_id, SUM(s.quantity * ri.quantity) AS expected
+        FROM sales s JOIN recipe_ingredients ri ON ri.recipe_id = s.recipe_id
+        GROUP BY ri.product_id
+    """).set_index('product_id')['expected']
+    consumed = -history[pd.to_datetime(history['created_at']).dt.hour == 22].groupby('product_id')['quantity'].sum()
+    assert consumed.sum() > 0
+    # Never more than the sales imply; less only on days the product ran out
+    assert (consumed <= usage.reindex(consumed.index) + 1e-6).all()